@@ -3,13 +3,17 @@ Persistent Agent Identity System for AlsaniaMCP
 Implements isolated memory namespaces and agent persona management
 """
 
+import asyncio
 import json
 import logging
+import threading
+import time
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import psycopg2
 import psycopg2.extras
+from cachetools import TTLCache
 
 from config.config import config
 
@@ -18,8 +22,24 @@ logger = logging.getLogger("alsaniamcp.agents")
 class AgentManager:
     """Manages persistent agent identities and memory namespaces"""
     
+    # Agent lists per API key are reused for this long; activity bumps invalidate them at most once a second
+    AGENT_LIST_CACHE_TTL = 30
+    INVALIDATION_COOLDOWN = 1.0
+    # Single agents back access checks, so they are only reused briefly
+    AGENT_CACHE_TTL = 10
+    AGENT_GENERATION_TTL = 60
+
     def __init__(self):
         self.postgres_url = config.POSTGRES_URL
+        self._agent_list_cache = TTLCache(maxsize=10_000, ttl=self.AGENT_LIST_CACHE_TTL)
+        self._agent_list_lock = threading.Lock()
+        self._agent_cache = TTLCache(maxsize=10_000, ttl=self.AGENT_CACHE_TTL)
+        self._agent_inflight: Dict[str, asyncio.Future] = {}
+        self._cache_generation = 0
+        # Per-agent invalidation counters; they only need to outlive an in-flight _load_agent
+        self._agent_generations = TTLCache(maxsize=10_000, ttl=self.AGENT_GENERATION_TTL)
+        self._trailing_invalidation: Optional[threading.Timer] = None
+        self._last_invalidation = 0.0
         self._ensure_agent_tables()
     
     def get_postgres_connection(self):
@@ -83,6 +103,11 @@ class AgentManager:
                         ON agents.agent_identities(memory_namespace)
                     """)
                     
+                    cur.execute("""
+                        CREATE INDEX IF NOT EXISTS idx_agent_identities_api_key 
+                        ON agents.agent_identities(api_key_id)
+                    """)
+                    
                     cur.execute("""
                         CREATE INDEX IF NOT EXISTS idx_agent_memories_agent 
                         ON agents.agent_memories(agent_id)
@@ -167,6 +192,7 @@ class AgentManager:
                     conn.commit()
                     
                     logger.info(f"✅ Created agent: {agent_name} (namespace: {memory_namespace})")
+                    self.invalidate_agent_cache()
                     
                     return {
                         'id': agent_id,
@@ -234,9 +260,41 @@ class AgentManager:
             logger.error(f"Failed to get agent: {e}")
             return None
     
+    async def get_agent_async(self, agent_id: str) -> Optional[Dict]:
+        """get_agent by ID off the event loop; concurrent misses share one query"""
+        with self._agent_list_lock:
+            cached = self._agent_cache.get(agent_id)
+        if cached is not None:
+            return dict(cached)
+
+        inflight = self._agent_inflight.get(agent_id)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._load_agent(agent_id))
+            self._agent_inflight[agent_id] = inflight
+            inflight.add_done_callback(lambda _: self._agent_inflight.pop(agent_id, None))
+        # shield: one cancelled waiter must not cancel the query for the others
+        agent = await asyncio.shield(inflight)
+        return dict(agent) if agent else None
+
+    async def _load_agent(self, agent_id: str) -> Optional[Dict]:
+        with self._agent_list_lock:
+            generation = (self._cache_generation, self._agent_generations.get(agent_id, 0))
+        agent = await asyncio.to_thread(self.get_agent, agent_id=agent_id)
+        with self._agent_list_lock:
+            # Skip caching if the agent was invalidated while the query ran
+            if agent and generation == (self._cache_generation, self._agent_generations.get(agent_id, 0)):
+                self._agent_cache[agent_id] = agent
+        return agent
+
     def list_agents(self, api_key_id: str = None, include_inactive: bool = False) -> List[Dict]:
         """List all agents, optionally filtered by API key"""
         
+        cache_key = (api_key_id, include_inactive)
+        with self._agent_list_lock:
+            cached = self._agent_list_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         try:
             with self.get_postgres_connection() as conn:
                 with conn.cursor() as cur:
@@ -263,7 +321,7 @@ class AgentManager:
                     
                     results = cur.fetchall()
                     
-                    return [
+                    agents = [
                         {
                             'id': row['id'],
                             'agent_name': row['agent_name'],
@@ -280,11 +338,43 @@ class AgentManager:
                         }
                         for row in results
                     ]
+                    with self._agent_list_lock:
+                        self._agent_list_cache[cache_key] = agents
+                    return list(agents)
                     
         except Exception as e:
             logger.error(f"Failed to list agents: {e}")
             return []
     
+    def invalidate_agent_cache(self, agent_id: str = None, throttle: bool = False):
+        """Drop cached agent lists and every cached agent, or only agent_id's entry when given;
+        throttled calls clear the lists at most once per cooldown, with one trailing clear"""
+        now = time.monotonic()
+        with self._agent_list_lock:
+            if agent_id is not None:
+                self._agent_cache.pop(agent_id, None)
+                self._agent_generations[agent_id] = self._agent_generations.get(agent_id, 0) + 1
+            else:
+                self._agent_cache.clear()
+                self._cache_generation += 1
+            elapsed = now - self._last_invalidation
+            if throttle and elapsed < self.INVALIDATION_COOLDOWN:
+                # Clear once more when the cooldown ends, so this update isn't hidden until the TTL
+                if self._trailing_invalidation is None:
+                    timer = threading.Timer(self.INVALIDATION_COOLDOWN - elapsed, self._clear_agent_lists)
+                    timer.daemon = True
+                    timer.start()
+                    self._trailing_invalidation = timer
+                return
+            self._agent_list_cache.clear()
+            self._last_invalidation = now
+    
+    def _clear_agent_lists(self):
+        with self._agent_list_lock:
+            self._trailing_invalidation = None
+            self._agent_list_cache.clear()
+            self._last_invalidation = time.monotonic()
+    
     def update_agent_activity(self, agent_id: str) -> bool:
         """Update agent's last activity timestamp"""
         
@@ -298,6 +388,7 @@ class AgentManager:
                     """, (agent_id,))
                     
                     conn.commit()
+                    self.invalidate_agent_cache(agent_id, throttle=True)
                     return cur.rowcount > 0
                     
         except Exception as e:
@@ -330,6 +421,7 @@ class AgentManager:
                     """, (agent_id, agent_id))
                     
                     conn.commit()
+                    self.invalidate_agent_cache(agent_id, throttle=True)
                     return True
                     
         except Exception as e:
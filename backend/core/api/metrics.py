@@ -82,6 +82,11 @@ def quarantine_log():
     try:
         with open("logs/forensics.log", "r") as f:
             lines = f.readlines()[-20:]
-            return {"entries": [json.loads(line) for line in lines if '"quarantine"' in line]}
+        entries = [json.loads(line) for line in lines if '"quarantine"' in line]
+        # Events store epoch seconds; render them as ISO timestamps here
+        for entry in entries:
+            if isinstance(entry.get("timestamp"), (int, float)):
+                entry["timestamp"] = datetime.fromtimestamp(entry["timestamp"]).isoformat()
+        return {"entries": entries}
     except Exception as e:
         return {"error": str(e)}
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+Response classes for AlsaniaMCP
+orjson-backed JSON rendering used as the application's default response class
+"""
+
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson doesn't handle natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes with the shared orjson options"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (datetime/UUID/numpy handled natively)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -3,7 +3,7 @@ from fastapi.responses import FileResponse
 from pydantic import BaseModel
 import sys, os, datetime
 from pathlib import Path
-from memory.storage import bulk_store, get_all_memories, store_memory, import_dataset
+from memory.storage import bulk_store_async, get_all_memories, store_memory, import_dataset
 import subprocess
 import json, hashlib, tempfile, shutil, zipfile
 from starlette.responses import JSONResponse
@@ -111,7 +111,7 @@ async def import_dataset(file: UploadFile = File(...)):
                             "agent_access": entry.get("metadata", {}).get("agent_access", ["echo"])
                         }
                     })
-                bulk_store(memories)
+                await bulk_store_async(memories)
                 imported_count += len(memories)
 
         return JSONResponse({"status": "success", "imported": imported_count})
@@ -7,12 +7,14 @@ import asyncio
 import hashlib
 import json
 import logging
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 import psycopg2
 import psycopg2.extras
+from cachetools import TLRUCache
 from fastapi import HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -22,6 +24,10 @@ logger = logging.getLogger("alsaniamcp.auth")
 
 class RateLimiter:
     """Token bucket rate limiter with sliding window"""
+
+    # Per-client fixed-window counters used by the rate limit middleware
+    MAX_TRACKED_CLIENTS = 65536
+    CLIENT_WINDOW_SECONDS = 60
     
     def __init__(self):
         self.buckets = defaultdict(lambda: {
@@ -32,8 +38,33 @@ class RateLimiter:
         self.default_limits = {
             'requests_per_minute': 60,
             'requests_per_hour': 1000,
-            'burst_limit': 100
+            'burst_limit': 100,
+            'client_requests_per_minute': 600
         }
+        # client_id -> [window_index, count], least recently seen first
+        self.client_windows = OrderedDict()
+    
+    def is_rate_limited(self, client_id: str, limit: Optional[int] = None) -> bool:
+        """Fixed-window per-client check with bounded (LRU) memory"""
+        if limit is None:
+            limit = self.default_limits['client_requests_per_minute']
+        
+        window = int(time.time()) // self.CLIENT_WINDOW_SECONDS
+        entry = self.client_windows.get(client_id)
+        
+        if entry is None:
+            entry = [window, 0]
+            self.client_windows[client_id] = entry
+            if len(self.client_windows) > self.MAX_TRACKED_CLIENTS:
+                self.client_windows.popitem(last=False)
+        else:
+            self.client_windows.move_to_end(client_id)
+            if entry[0] != window:
+                entry[0] = window
+                entry[1] = 0
+        
+        entry[1] += 1
+        return entry[1] > limit
     
     def is_allowed(self, api_key: str, limits: Optional[Dict] = None) -> Tuple[bool, Dict]:
         """Check if request is allowed under rate limits"""
@@ -96,6 +127,23 @@ class RateLimiter:
             'limits': limits
         }
 
+# Bit assigned to each known permission; "admin" grants everything
+PERMISSION_BITS = {
+    name: 1 << bit for bit, name in enumerate((
+        "admin", "read", "write", "manage_keys", "manage_agents", "manage_snapshots",
+        "system_config", "namespace_isolation", "restricted_agents"
+    ))
+}
+ADMIN_BIT = PERMISSION_BITS["admin"]
+
+def pack_permissions(permissions: Dict) -> int:
+    """Pack a permissions dict into an int bitmask of the granted known permissions"""
+    bits = 0
+    for name, granted in permissions.items():
+        if granted and name in PERMISSION_BITS:
+            bits |= PERMISSION_BITS[name]
+    return bits
+
 class APIKeyManager:
     """Enhanced API key manager with multi-tier permissions and quotas"""
 
@@ -150,8 +198,16 @@ class APIKeyManager:
         }
     }
 
+    # Validated key info is reused for at most this long (less if the key expires sooner)
+    KEY_INFO_CACHE_TTL = 30
+    # Pending usage counters are written, and revoked keys evicted, this often
+    USAGE_FLUSH_INTERVAL = 5
+
     def __init__(self):
         self.postgres_url = config.POSTGRES_URL
+        self._key_info_cache = TLRUCache(maxsize=10_000, ttu=self._key_info_ttu)
+        self._pending_usage = defaultdict(int)
+        self._key_cache_lock = threading.Lock()
         self._ensure_api_keys_table()
 
     def get_postgres_connection(self):
@@ -244,11 +300,58 @@ class APIKeyManager:
             logger.error(f"Failed to initialize API keys table: {e}")
             raise
     
+    def _key_info_ttu(self, _key_hash, key_info: Dict, now: float) -> float:
+        """Cache deadline for key info, capped at the key's own expiry"""
+        ttl = self.KEY_INFO_CACHE_TTL
+        expires_ts = key_info.get('_expires_ts')
+        if expires_ts is not None:
+            ttl = min(ttl, expires_ts - time.time())
+        return now + ttl
+
+    @staticmethod
+    def _record_usage(cur, key_hash: str, request_count: int):
+        """Add request_count to a key's lifetime and daily usage"""
+        cur.execute("""
+            UPDATE alsania.api_keys
+            SET last_used = NOW(), usage_count = usage_count + %s
+            WHERE key_hash = %s
+            RETURNING id
+        """, (request_count, key_hash))
+        row = cur.fetchone()
+        if not row:
+            return
+
+        cur.execute("""
+            INSERT INTO alsania.api_key_usage (api_key_id, requests_count)
+            VALUES (%s, %s)
+            ON CONFLICT (api_key_id, date)
+            DO UPDATE SET
+                requests_count = api_key_usage.requests_count + EXCLUDED.requests_count,
+                last_updated = NOW()
+        """, (row['id'], request_count))
+
+    def _restore_usage(self, pending: Dict[str, int]):
+        with self._key_cache_lock:
+            for key_hash, count in pending.items():
+                if count:
+                    self._pending_usage[key_hash] += count
+
     def validate_api_key(self, api_key: str) -> Optional[Dict]:
         """Validate API key and return enhanced key info"""
-        try:
-            key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+
+        with self._key_cache_lock:
+            key_info = self._key_info_cache.get(key_hash)
+            if key_info is not None:
+                expires_ts = key_info.get('_expires_ts')
+                if expires_ts is None or expires_ts > time.time():
+                    # Counted now, written to the database by flush_usage
+                    self._pending_usage[key_hash] += 1
+                    return key_info
+                del self._key_info_cache[key_hash]
+            pending_count = self._pending_usage.pop(key_hash, 0)
 
+        try:
             with self.get_postgres_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("""
@@ -262,28 +365,18 @@ class APIKeyManager:
 
                     result = cur.fetchone()
                     if not result:
+                        # Requests served before the key was revoked or expired still count
+                        if pending_count:
+                            self._record_usage(cur, key_hash, pending_count)
+                            conn.commit()
                         return None
 
-                    # Update last used timestamp and usage count
-                    cur.execute("""
-                        UPDATE alsania.api_keys
-                        SET last_used = NOW(), usage_count = usage_count + 1
-                        WHERE key_hash = %s
-                    """, (key_hash,))
-
-                    # Update daily usage tracking
-                    cur.execute("""
-                        INSERT INTO alsania.api_key_usage (api_key_id, requests_count)
-                        VALUES (%s, 1)
-                        ON CONFLICT (api_key_id, date)
-                        DO UPDATE SET
-                            requests_count = api_key_usage.requests_count + 1,
-                            last_updated = NOW()
-                    """, (result['id'],))
-
+                    # Update last used timestamp, usage count and daily usage
+                    request_count = pending_count + 1
+                    self._record_usage(cur, key_hash, request_count)
                     conn.commit()
 
-                    return {
+                    key_info = {
                         'id': result['id'],
                         'name': result['name'],
                         'tier': result['tier'],
@@ -292,14 +385,58 @@ class APIKeyManager:
                         'rate_limits': result['rate_limits'] or {},
                         'namespaces': result['namespaces'] or [],
                         'allowed_agents': result['allowed_agents'] or [],
-                        'usage_count': result['usage_count'] + 1,
-                        'metadata': result['metadata'] or {}
+                        'usage_count': result['usage_count'] + request_count,
+                        'metadata': result['metadata'] or {},
+                        '_expires_ts': result['expires_at'].timestamp() if result['expires_at'] else None
                     }
+                    with self._key_cache_lock:
+                        self._key_info_cache[key_hash] = key_info
+                    return key_info
 
         except Exception as e:
+            self._restore_usage({key_hash: pending_count})
             logger.error(f"API key validation failed: {e}")
             return None
-    
+
+    def flush_usage(self):
+        """Write pending usage counts and evict cached keys revoked or expired by any worker"""
+        with self._key_cache_lock:
+            pending = dict(self._pending_usage)
+            self._pending_usage.clear()
+            cached = list(self._key_info_cache.keys())
+        if not pending and not cached:
+            return
+
+        try:
+            with self.get_postgres_connection() as conn:
+                with conn.cursor() as cur:
+                    for key_hash, count in pending.items():
+                        self._record_usage(cur, key_hash, count)
+                    valid = set()
+                    if cached:
+                        cur.execute("""
+                            SELECT key_hash FROM alsania.api_keys
+                            WHERE key_hash = ANY(%s) AND is_active = true
+                            AND (expires_at IS NULL OR expires_at > NOW())
+                        """, (cached,))
+                        valid = {row['key_hash'] for row in cur.fetchall()}
+                    conn.commit()
+        except Exception as e:
+            self._restore_usage(pending)
+            logger.error(f"API key usage flush failed: {e}")
+            return
+
+        with self._key_cache_lock:
+            for key_hash in cached:
+                if key_hash not in valid:
+                    self._key_info_cache.pop(key_hash, None)
+
+    async def run_usage_flusher(self):
+        """Call flush_usage every USAGE_FLUSH_INTERVAL seconds (until cancelled)"""
+        while True:
+            await asyncio.sleep(self.USAGE_FLUSH_INTERVAL)
+            await asyncio.to_thread(self.flush_usage)
+
     def create_api_key(self, name: str, tier: str = None, description: str = "",
                       permissions: Dict = None, quotas: Dict = None,
                       namespaces: List[str] = None, allowed_agents: List[str] = None,
@@ -496,6 +633,13 @@ class APIKeyManager:
             logger.error(f"Usage update failed: {e}")
             return False
 
+    def invalidate_key_info(self, key_id: str):
+        """Drop cached key info for an API key so the next request re-validates it"""
+        with self._key_cache_lock:
+            for key_hash, key_info in list(self._key_info_cache.items()):
+                if str(key_info['id']) == str(key_id):
+                    del self._key_info_cache[key_hash]
+
     def revoke_api_key(self, key_id: str) -> bool:
         """Revoke an API key"""
         try:
@@ -508,6 +652,7 @@ class APIKeyManager:
                     """, (key_id,))
 
                     conn.commit()
+                    self.invalidate_key_info(key_id)
 
                     if cur.rowcount > 0:
                         logger.info(f"✅ Revoked API key: {key_id}")
@@ -554,11 +699,18 @@ class AuthenticationManager:
         # Add rate limit headers to response (will be handled by middleware)
         request.state.rate_limit_info = rate_info
         request.state.api_key_info = key_info
+        key_info['_perm_bits'] = pack_permissions(key_info.get('permissions') or {})
         
         return key_info
     
     def check_permission(self, key_info: Dict, required_permission: str) -> bool:
         """Check if API key has required permission"""
+        bits = key_info.get('_perm_bits')
+        required_bit = PERMISSION_BITS.get(required_permission)
+        if bits is not None and required_bit is not None:
+            # Admin permission grants all access
+            return (bits & (required_bit | ADMIN_BIT)) != 0
+
         permissions = key_info.get('permissions', {})
         
         # Admin permission grants all access
@@ -9,9 +9,10 @@ import logging
 import os
 import pickle
 import re
+import threading
 from typing import List, Optional, Dict, Any
 import numpy as np
-from collections import Counter
+from collections import Counter, OrderedDict
 import math
 
 logger = logging.getLogger("alsaniamcp.embeddings")
@@ -23,6 +24,10 @@ class LocalEmbedding:
         self.embedding_dim = embedding_dim
         self.vocabulary = {}
         self.idf_scores = {}
+        self.loaded = False
+        # Serializes load() and the vocabulary updates made while embedding; callers may be
+        # the embedding batcher or any asyncio.to_thread worker
+        self._lock = threading.Lock()
         self.cache_dir = "cache/embeddings"
         self.vocab_file = os.path.join(self.cache_dir, "vocabulary.json")
         self.idf_file = os.path.join(self.cache_dir, "idf_scores.json")
@@ -30,10 +35,6 @@ class LocalEmbedding:
         # Ensure cache directory exists
         os.makedirs(self.cache_dir, exist_ok=True)
         
-        # Load existing vocabulary and IDF scores
-        self._load_vocabulary()
-        self._load_idf_scores()
-        
         # Semantic feature extractors
         self.semantic_patterns = {
             'question': [r'\?', r'\bwhat\b', r'\bhow\b', r'\bwhy\b', r'\bwhen\b', r'\bwhere\b', r'\bwho\b'],
@@ -45,6 +46,20 @@ class LocalEmbedding:
             'memory': [r'\b(remember|recall|forget|store|save|retrieve)\b']
         }
     
+    def load(self):
+        """Load vocabulary and IDF scores from cache (deferred until first use)"""
+        if self.loaded:
+            return
+        with self._lock:
+            self._load_unlocked()
+    
+    def _load_unlocked(self):
+        if self.loaded:
+            return
+        self._load_vocabulary()
+        self._load_idf_scores()
+        self.loaded = True
+    
     def _load_vocabulary(self):
         """Load vocabulary from cache"""
         try:
@@ -161,55 +176,69 @@ class LocalEmbedding:
         
         self._save_idf_scores()
     
+    def _raw_embedding(self, text: str) -> np.ndarray:
+        """Build the unnormalized embedding vector for text"""
+        # Tokenize text
+        tokens = self._tokenize(text)
+        
+        # Update vocabulary
+        self._update_vocabulary(tokens)
+        
+        # Extract semantic features
+        semantic_features = self._extract_semantic_features(text)
+        
+        # Compute TF-IDF features
+        tf_idf = self._compute_tf_idf(tokens)
+        
+        # Create embedding vector
+        embedding = np.zeros(self.embedding_dim)
+        
+        # Fill semantic features (first part of embedding)
+        semantic_dim = min(len(semantic_features), self.embedding_dim // 4)
+        embedding[:semantic_dim] = semantic_features[:semantic_dim]
+        
+        # Fill TF-IDF features (remaining part of embedding)
+        tfidf_start = semantic_dim
+        tfidf_dim = self.embedding_dim - tfidf_start
+        
+        # Map tokens to embedding dimensions using vocabulary indices
+        for token, score in tf_idf.items():
+            if token in self.vocabulary:
+                vocab_idx = self.vocabulary[token]
+                embed_idx = tfidf_start + (vocab_idx % tfidf_dim)
+                embedding[embed_idx] += score
+        
+        return embedding
+    
+    def _fallback_embedding(self, text: str) -> List[float]:
+        """Random normalized vector, seeded by the text"""
+        import random
+        random.seed(hash(text) % (2**32))
+        embedding = [random.gauss(0, 0.1) for _ in range(self.embedding_dim)]
+        norm = math.sqrt(sum(x * x for x in embedding))
+        return [x / norm for x in embedding] if norm > 0 else embedding
+    
     def embed_text(self, text: str) -> List[float]:
         """Generate embedding for text using local methods"""
-        try:
-            # Tokenize text
-            tokens = self._tokenize(text)
-            
-            # Update vocabulary
-            self._update_vocabulary(tokens)
-            
-            # Extract semantic features
-            semantic_features = self._extract_semantic_features(text)
-            
-            # Compute TF-IDF features
-            tf_idf = self._compute_tf_idf(tokens)
-            
-            # Create embedding vector
-            embedding = [0.0] * self.embedding_dim
-            
-            # Fill semantic features (first part of embedding)
-            semantic_dim = min(len(semantic_features), self.embedding_dim // 4)
-            for i in range(semantic_dim):
-                embedding[i] = semantic_features[i]
-            
-            # Fill TF-IDF features (remaining part of embedding)
-            tfidf_start = semantic_dim
-            tfidf_dim = self.embedding_dim - tfidf_start
-            
-            # Map tokens to embedding dimensions using vocabulary indices
-            for token, score in tf_idf.items():
-                if token in self.vocabulary:
-                    vocab_idx = self.vocabulary[token]
-                    embed_idx = tfidf_start + (vocab_idx % tfidf_dim)
-                    embedding[embed_idx] += score
-            
-            # Normalize embedding to unit vector
-            norm = math.sqrt(sum(x * x for x in embedding))
-            if norm > 0:
-                embedding = [x / norm for x in embedding]
-            
-            return embedding
-            
-        except Exception as e:
-            logger.error(f"Local embedding failed: {e}")
-            # Return random normalized vector as fallback
-            import random
-            random.seed(hash(text) % (2**32))
-            embedding = [random.gauss(0, 0.1) for _ in range(self.embedding_dim)]
-            norm = math.sqrt(sum(x * x for x in embedding))
-            return [x / norm for x in embedding] if norm > 0 else embedding
+        return self.embed_texts([text])[0]
+    
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for several texts, normalized together in one pass"""
+        matrix = np.zeros((len(texts), self.embedding_dim))
+        with self._lock:
+            self._load_unlocked()
+            for i, text in enumerate(texts):
+                try:
+                    matrix[i] = self._raw_embedding(text)
+                except Exception as e:
+                    logger.error(f"Local embedding failed: {e}")
+                    # Return random normalized vector as fallback
+                    matrix[i] = self._fallback_embedding(text)
+        
+        # Normalize embeddings to unit vectors
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix.tolist()
 
 class EmbeddingManager:
     """Manages embedding generation with fallback options"""
@@ -219,6 +248,10 @@ class EmbeddingManager:
         self.cache_dir = "cache/embeddings"
         os.makedirs(self.cache_dir, exist_ok=True)
     
+    def preload(self):
+        """Warm the local embedder so the first request doesn't pay for it"""
+        self.local_embedder.load()
+    
     def _get_cache_path(self, text: str) -> str:
         """Get cache file path for text"""
         text_hash = hashlib.sha256(text.encode()).hexdigest()
@@ -269,6 +302,35 @@ class EmbeddingManager:
         self._save_to_cache(text, local_embedding)
         return local_embedding
     
+    def get_embeddings(self, texts: List[str], use_external: bool = False) -> List[List[float]]:
+        """Get embeddings for several texts"""
+        return self.get_embeddings_batch(texts, use_external)
+    
+    def get_embeddings_batch(self, texts: List[str], use_external: bool = False) -> List[List[float]]:
+        """Get embeddings for several texts; cache misses are embedded in a single batch"""
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        missing = []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                logger.warning("Empty text provided for embedding")
+                embeddings[i] = [0.0] * 384
+                continue
+            cached_embedding = self._load_from_cache(text)
+            if cached_embedding:
+                embeddings[i] = cached_embedding
+            elif use_external and (external_embedding := self._get_external_embedding(text)):
+                self._save_to_cache(text, external_embedding)
+                embeddings[i] = external_embedding
+            else:
+                missing.append(i)
+        
+        if missing:
+            local_embeddings = self.local_embedder.embed_texts([texts[i] for i in missing])
+            for i, embedding in zip(missing, local_embeddings):
+                self._save_to_cache(texts[i], embedding)
+                embeddings[i] = embedding
+        return embeddings
+    
     def _get_external_embedding(self, text: str) -> Optional[List[float]]:
         """Get embedding from external API (OpenRouter) if available"""
         try:
@@ -317,3 +379,49 @@ def get_embedding(text: str, use_external: bool = False) -> List[float]:
 def embed_text(text: str) -> List[float]:
     """Simple embedding function for backward compatibility"""
     return embedding_manager.get_embedding(text, use_external=False)
+
+# In-memory LRU for repeated query embeddings, stored as int8 codes + scale
+QUERY_CACHE_SIZE = 4096
+_query_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+_query_cache_stats = {"hits": 0, "misses": 0}
+
+def quantize_embedding(embedding: List[float]) -> bytes:
+    """Pack an embedding as a float32 scale followed by int8 codes"""
+    vector = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.abs(vector).max()) / 127 or 1.0
+    codes = np.round(vector / scale).astype(np.int8)
+    return np.float32(scale).tobytes() + codes.tobytes()
+
+def dequantize_embedding(blob: bytes) -> List[float]:
+    """Unpack an embedding produced by quantize_embedding"""
+    scale = np.frombuffer(blob[:4], dtype=np.float32)[0]
+    return (np.frombuffer(blob[4:], dtype=np.int8).astype(np.float32) * scale).tolist()
+
+def cached_embedding(text: str) -> List[float]:
+    """Get a query embedding, skipping generation for recently seen queries"""
+    key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+    
+    with _query_cache_lock:
+        blob = _query_cache.get(key)
+        if blob is not None:
+            _query_cache.move_to_end(key)
+            _query_cache_stats["hits"] += 1
+        else:
+            _query_cache_stats["misses"] += 1
+    if blob is not None:
+        return dequantize_embedding(blob)
+    
+    blob = quantize_embedding(embedding_manager.get_embedding(text, use_external=False))
+    
+    with _query_cache_lock:
+        _query_cache[key] = blob
+        if len(_query_cache) > QUERY_CACHE_SIZE:
+            _query_cache.popitem(last=False)
+    # Misses return the same dequantized vector a later hit would, so results don't depend on cache state
+    return dequantize_embedding(blob)
+
+def query_cache_info() -> Dict[str, int]:
+    """Hit/miss counters and occupancy of the query embedding cache"""
+    with _query_cache_lock:
+        return {**_query_cache_stats, "size": len(_query_cache), "maxsize": QUERY_CACHE_SIZE}
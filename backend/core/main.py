@@ -1,21 +1,25 @@
 # Alsania Memory Control Plane - Main Application
 
 # Standard library imports
-import asyncio, logging, os, json
+import asyncio, hmac, logging, os, json, time
 from pathlib import Path
 from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import List
 
 # Third-party imports
-import requests
+import httpx
+import orjson
+import psutil
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.params import Depends
 from fastapi.security import HTTPBearer
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, field_validator
+from starlette.datastructures import MutableHeaders
 
 # backend/core/main.py
 from backend.mcp.router import app as mcp_app
@@ -44,25 +48,33 @@ snapshot_manager = safe_import_from('backend.core.snapshots', 'snapshot_manager'
 # Memory Subsystem
 memory_imports = safe_import_from(
     'backend.core.memory.storage',
-    ['bulk_store', 'save_snapshot', 'load_snapshot', 'list_snapshots', 'delete_snapshot'],
+    ['bulk_store', 'bulk_store_async', 'init_pool', 'close_pool',
+     'save_snapshot', 'load_snapshot', 'list_snapshots', 'delete_snapshot'],
     required=False
 )
 bulk_store = memory_imports.get('bulk_store') if memory_imports else None
+bulk_store_async = memory_imports.get('bulk_store_async') if memory_imports else None
+init_pool = memory_imports.get('init_pool') if memory_imports else None
+close_pool = memory_imports.get('close_pool') if memory_imports else None
 save_snapshot = memory_imports.get('save_snapshot') if memory_imports else None
 load_snapshot = memory_imports.get('load_snapshot') if memory_imports else None
-list_snapshots = memory_imports.get('list_snapshots') if memory_imports else None
-delete_snapshot = memory_imports.get('delete_snapshot') if memory_imports else None
+# Aliased: the /snapshots endpoints below are named list_snapshots and delete_snapshot
+list_stored_snapshots = memory_imports.get('list_snapshots') if memory_imports else None
+delete_stored_snapshot = memory_imports.get('delete_snapshot') if memory_imports else None
 
 # Additional memory components
 log_edit = safe_import_from('backend.core.memory.forensics.forensics', 'log_edit', required=False)
 log_access = safe_import_from('backend.core.memory.forensics.forensics', 'log_access', required=False)
 secure_memory_id = safe_import_from('backend.core.lib.secure_memory_id', 'secure_memory_id', required=False)
 VectorStore = safe_import_from('backend.core.memory.vector_store', 'VectorStore', required=False)
+init_vector_store = safe_import_from('backend.core.memory.vector_store', 'init_vector_store', required=False)
+memory_vectors_client = safe_import_from('backend.core.memory.vector_store', 'async_client', required=False)
 generate_hashes = safe_import_from('backend.core.memory.snapshots.integrity_check', 'generate_hashes', required=False)
 
 # Infrastructure
 embedding_manager = safe_import_from('backend.core.embeddings', 'embedding_manager', required=False)
 embed_text = safe_import_from('backend.core.embeddings', 'embed_text', required=False)
+cached_embedding = safe_import_from('backend.core.embeddings', 'cached_embedding', required=False)
 openai_compat_imports = safe_import_from(
     'backend.core.openai_compat',
     ['openai_compat', 'ChatCompletionRequest', 'EmbeddingRequest'],
@@ -73,13 +85,16 @@ ChatCompletionRequest = openai_compat_imports.get('ChatCompletionRequest') if op
 EmbeddingRequest = openai_compat_imports.get('EmbeddingRequest') if openai_compat_imports else None
 
 # Agent System
-list_agents = safe_import_from('backend.agents.core.agent_manager', 'list_agents', required=False)
+# Aliased so the /agents endpoint below doesn't shadow it
+list_running_agents = safe_import_from('backend.agents.core.agent_manager', 'list_agents', required=False)
 ScribeAgent = safe_import_from('backend.agents.scribe.agent', 'ScribeAgent', required=False)
 start_sentinel = safe_import_from('backend.agents.sentinel.agent', 'start_sentinel', required=False)
 
 # Local imports - API Layer
 from api.routes import router as routes
 from api.metrics import router as metrics
+from api.responses import ORJSONResponse, dumps as orjson_dumps
+from shared.utils import QueueBatcher, cached_with_ttl, collect_batch
 
 # Local imports - Experimental/Chaos
 project_root = Path(__file__).parent.parent.parent
@@ -114,6 +129,30 @@ vector_store = VectorStore(host=qdrant_host, port=qdrant_port)
 logging.basicConfig(level=getattr(logging, config.LOG_LEVEL.upper()))
 logger = logging.getLogger("alsaniamcp")
 
+# Failed warmups are retried after WARMUP_RETRY_INITIAL seconds, doubling up to WARMUP_RETRY_MAX
+WARMUP_RETRY_INITIAL = 1.0
+WARMUP_RETRY_MAX = 60.0
+
+async def _warmup(app: FastAPI):
+    """Warm embedding and vector store backends once the app is serving, retrying until it succeeds."""
+    delay = WARMUP_RETRY_INITIAL
+    while True:
+        try:
+            await asyncio.to_thread(embedding_manager.preload)
+            await asyncio.to_thread(vector_db.ensure_collection)
+            if openai_compat:
+                await asyncio.to_thread(openai_compat.preload_tokenizer)
+            break
+        except Exception as e:
+            # Readiness stays unset meanwhile, so /readyz answers 503 with the latest reason
+            app.state.warmup_error = str(e)
+            logger.error("❌ Warmup failed, retrying in %.0fs: %s", delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX)
+    app.state.warmup_error = None
+    app.state.ready.set()
+    logger.info("✅ Warmup complete")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🧠 Starting Alsania Memory Control Plane")
@@ -129,15 +168,54 @@ async def lifespan(app: FastAPI):
         start_chaos_mode()
     start_chaos_agent()
 
+    # Shared asyncpg pool for request-path storage; sync psycopg2 remains the fallback
+    app.state.pool = None
+    if init_pool:
+        try:
+            app.state.pool = await init_pool()
+        except Exception as e:
+            logger.warning("⚠️ Postgres pool unavailable, using sync storage: %s", e)
+
+    # memory_vectors collection is ensured once here rather than on every add/search
+    if init_vector_store:
+        try:
+            await init_vector_store()
+        except Exception as e:
+            logger.warning("⚠️ Could not ensure memory_vectors collection: %s", e)
+
+    # Heavy warmup runs in the background so startup isn't blocked on it
+    app.state.ready = asyncio.Event()
+    app.state.warmup_error = None
+    warmup_task = asyncio.create_task(_warmup(app))
+    memory_batcher.start()
+    embedding_batcher.start()
+    usage_task = asyncio.create_task(auth_manager.api_key_manager.run_usage_flusher()) if auth_manager else None
+
     logger.info("✅ Application startup complete")
     yield
     logger.info("🛑 Shutting down application")
+    warmup_task.cancel()
+    memory_batcher.stop()
+    embedding_batcher.stop()
+    if usage_task is not None:
+        usage_task.cancel()
+        await asyncio.to_thread(auth_manager.api_key_manager.flush_usage)
+    if app.state.pool is not None:
+        await close_pool()
+    if persistence_manager:
+        await persistence_manager.close()
+    if vector_db.async_client:
+        await vector_db.flush()
+        await vector_db.async_client.close()
+    if memory_vectors_client:
+        await memory_vectors_client.close()
 
 app = FastAPI(
     title="AlsaniaMCP",
     description="Hardened memory server for the Alsania ecosystem",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -157,69 +235,126 @@ frontend_path = Path(__file__).parent.parent.parent / "frontend"
 if frontend_path.exists():
     app.mount("/frontend", StaticFiles(directory=str(frontend_path)), name="frontend")
 
+# Frontend index is read once at startup instead of stat'ed on every "/" hit
+frontend_index = frontend_path / "mcp.html"
+frontend_index_bytes = frontend_index.read_bytes() if frontend_index.exists() else None
+
 # Security configuration
 security = HTTPBearer()
 
 # === Middleware ===
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """Add X-Process-Time header to responses."""
-    start_time = datetime.now()
-    response = await call_next(request)
-    process_time = (datetime.now() - start_time).total_seconds()
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+# Pure ASGI middleware: avoids the per-request task and Request/Response
+# wrapping that BaseHTTPMiddleware (@app.middleware("http")) adds.
+async def send_error_response(scope, receive, send, status_code: int, detail: str, headers: dict = None):
+    """Short-circuit a request with a JSON error body."""
+    response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+    await response(scope, receive, send)
+
+class ProcessTimeMiddleware:
+    """Add X-Process-Time header to responses and log the request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        process_time = None
+
+        async def send_wrapper(message):
+            nonlocal process_time
+            if message["type"] == "http.response.start":
+                process_time = time.perf_counter() - start
+                MutableHeaders(scope=message).append("X-Process-Time", f"{process_time * 1000:.2f}ms")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if process_time is None:
+                process_time = time.perf_counter() - start
+            logger.info("%s %s processed in %.4fs", scope["method"], scope["path"], process_time)
 
 # === Authentication Middleware ===
-@app.middleware("http")
-async def authenticate_request(request: Request, call_next):
+class AuthenticationMiddleware:
     """Authenticate incoming requests."""
-    try:
-        key_info = await auth_manager.authenticate_request(request)
-        request.state.key_info = key_info
-        return await call_next(request)
-    except HTTPException as exc:
-        raise exc
-    except Exception as exc:
-        logger.exception(exc)
-        raise HTTPException(status_code=500, detail="Internal Server Error") from exc
-
-
-# === Logging Middleware ===
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log incoming requests."""
-    start_time = datetime.now()
-    response = await call_next(request)
-    process_time = (datetime.now() - start_time).total_seconds()
-    logger.info(f"{request.method} {request.url} processed in {process_time:.4f}s")
-    return response
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request = Request(scope, receive)
+        try:
+            request.state.key_info = await auth_manager.authenticate_request(request)
+        except HTTPException as exc:
+            return await send_error_response(scope, receive, send, exc.status_code, exc.detail, exc.headers)
+        except Exception as exc:
+            logger.exception(exc)
+            return await send_error_response(scope, receive, send, 500, "Internal Server Error")
+
+        await self.app(scope, receive, send)
 
 # === Rate Limiting Middleware ===
-@app.middleware("http")
-async def rate_limit(request: Request, call_next):
+class RateLimitMiddleware:
     """Rate limit incoming requests."""
-    ip_address = request.client.host
-    if auth_manager.rate_limiter.is_rate_limited(ip_address):
-        raise HTTPException(status_code=429, detail="Too Many Requests")
-    response = await call_next(request)
-    return response
 
+    def __init__(self, app):
+        self.app = app
 
-# Internal key validation middleware
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        client = scope.get("client")
+        ip_address = client[0] if client else "unknown"
+        if auth_manager.rate_limiter.is_rate_limited(ip_address):
+            return await send_error_response(scope, receive, send, 429, "Too Many Requests")
 
-def validate_api_key(request: Request, key_name: str, expected: str):
-    token = request.headers.get(key_name)
-    if token != expected:
+        await self.app(scope, receive, send)
+
+
+# Internal key validation middleware
+MCP_API_KEY = os.getenv("MCP_API_KEY")
+MCP_API_KEY_BYTES = MCP_API_KEY.encode() if MCP_API_KEY else None
+
+def validate_api_key(headers, key_name: bytes, expected: bytes):
+    """Check a raw ASGI header against the expected key in constant time."""
+    token = next((value for name, value in headers if name == key_name), None)
+    if token is None or expected is None:
+        valid = token is expected
+    else:
+        valid = hmac.compare_digest(token, expected)
+    if not valid:
         raise HTTPException(status_code=403, detail="Forbidden")
     return True
 
 # Enforce keys middleware
-@app.middleware("http")
-async def enforce_keys(request: Request, call_next):
-    if request.url.path.startswith("/internal"):
-        validate_api_key(request, "x-api-key", os.getenv("MCP_API_KEY"))
-    return await call_next(request)
+class EnforceKeysMiddleware:
+    """Require the internal API key on /internal routes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/internal"):
+            try:
+                validate_api_key(scope["headers"], b"x-api-key", MCP_API_KEY_BYTES)
+            except HTTPException as exc:
+                return await send_error_response(scope, receive, send, exc.status_code, exc.detail)
+
+        await self.app(scope, receive, send)
+
+# Registered innermost first: the last one added runs outermost, so cheap
+# rejections (internal key, rate limit) happen first and timing covers auth.
+app.add_middleware(AuthenticationMiddleware)
+app.add_middleware(ProcessTimeMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(EnforceKeysMiddleware)
 
 async def verify_token(request: Request, token: str = Depends(security)):
     """Enhanced authentication with rate limiting."""
@@ -237,9 +372,8 @@ def require_permission(permission: str):
         return key_info
     return decorator
 
-# Initialize vector database
+# Vector database (collection is ensured during background warmup)
 vector_db = vector_store
-vector_db.ensure_collection()
 
 # Initialize snapshots directory and generate hashes if possible
 try:
@@ -247,7 +381,7 @@ try:
     snapshots_dir.mkdir(exist_ok=True)
     generate_hashes()
 except Exception as e:
-    logger.warning(f"Could not initialize snapshots: {e}")
+    logger.warning("Could not initialize snapshots: %s", e)
 
 # === Pydantic Models ===
 class QueryRequest(BaseModel):
@@ -257,11 +391,12 @@ class QueryRequest(BaseModel):
     @field_validator('query')
     @classmethod
     def validate_query(cls, v):
-        if not v or len(v.strip()) == 0:
+        stripped = v.strip()
+        if not stripped:
             raise ValueError("Query cannot be empty")
-        if len(v) > 10000:
+        if len(stripped) > 10000:
             raise ValueError("Query too long")
-        return v.strip()
+        return stripped
 
 class StoreRequest(BaseModel):
     """Request model for storing memory entries."""
@@ -271,31 +406,138 @@ class StoreRequest(BaseModel):
     @field_validator('text')
     @classmethod
     def validate_text(cls, v):
-        if not v or len(v.strip()) == 0:
+        stripped = v.strip()
+        if not stripped:
             raise ValueError("Memory text cannot be empty")
-        return v.strip()
+        return stripped
+
+class BatchSearchRequest(BaseModel):
+    """Request model for batched memory search."""
+    queries: List[str]
+    limit: int = 5
+
+    @field_validator('queries')
+    @classmethod
+    def validate_queries(cls, v):
+        stripped = [q.strip() for q in v]
+        if not stripped or not all(stripped):
+            raise ValueError("Queries cannot be empty")
+        if len(stripped) > 100:
+            raise ValueError("Too many queries")
+        return stripped
 
 # === Helper Functions ===
-def save_memory_entry(mem_id: str, text: str, source: str):
-    """Save a memory entry to storage."""
-    # This function should be implemented based on your storage requirements
-    # For now, we'll use the bulk_store function with a single entry
-    memory = {
+def build_memory_entry(mem_id: str, text: str, source: str) -> dict:
+    """Build the storage record for a memory entry."""
+    return {
         "mem_id": mem_id,
         "text": text,
         "source": source,
         "metadata": {"agent_access": ["echo"]}
     }
-    bulk_store([memory])
 
-def search_similar(embedding, top_k: int = 5, namespace: str = "default"):
+def save_memory_entry(mem_id: str, text: str, source: str):
+    """Save a memory entry to storage."""
+    # This function should be implemented based on your storage requirements
+    # For now, we'll use the bulk_store function with a single entry
+    bulk_store([build_memory_entry(mem_id, text, source)])
+
+async def search_similar(embedding, top_k: int = 5, namespace: str = "default"):
     """Search for similar vectors using the vector store."""
-    return vector_store.search(embedding, top_k, namespace)
+    return await vector_store.search_async(embedding, top_k, namespace)
 
-def insert_vector(embedding, payload, namespace: str = "default"):
+async def insert_vector(embedding, payload, namespace: str = "default"):
     """Insert a vector into the vector store."""
     text = payload.get("text", "")
-    return vector_store.insert(text, embedding, namespace)
+    return await vector_store.insert_async(text, embedding, namespace)
+
+def format_search_results(results) -> list:
+    """Shape vector search hits for the frontend."""
+    return [
+        {
+            "id": result.get("id"),
+            "text": result.get("text", ""),
+            "score": round(result.get("score", 0), 4),
+            "source": result.get("source", "unknown"),
+            "timestamp": result.get("timestamp", "")
+        }
+        for result in results
+    ]
+
+class EmbeddingBatcher(QueueBatcher):
+    """Generate embeddings in a worker thread, coalescing concurrent requests per call."""
+
+    def __init__(self, max_batch: int = 64, max_wait: float = 0.005):
+        super().__init__(max_batch, max_wait)
+
+    async def embed(self, text: str, cache: bool = True) -> List[float]:
+        """Queue a text and wait for its embedding; cache=True uses the query LRU."""
+        return await self._submit(text, cache)
+
+    async def embed_many(self, texts: List[str], cache: bool = True) -> List[List[float]]:
+        """Embed several texts, sharing worker calls with any concurrent requests."""
+        return await asyncio.gather(*(self.embed(text, cache) for text in texts))
+
+    async def run(self):
+        """Drain the queue, computing up to max_batch embeddings per worker call."""
+        while True:
+            batch = await collect_batch(self.queue, self.max_batch, self.max_wait)
+            try:
+                embeddings = await asyncio.to_thread(self._compute, batch)
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (*_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+    @staticmethod
+    def _compute(batch) -> list:
+        return [
+            cached_embedding(text) if cache else embedding_manager.get_embedding(text, use_external=False)
+            for text, cache, _ in batch
+        ]
+
+embedding_batcher = EmbeddingBatcher()
+
+class MemoryWriteBatcher(QueueBatcher):
+    """Coalesce memory writes into one bulk_store + one vector upsert per batch."""
+
+    def __init__(self, max_batch: int = 32, max_wait: float = 0.01):
+        super().__init__(max_batch, max_wait)
+
+    async def submit(self, mem_id: str, text: str, source: str, embedding) -> str:
+        """Queue a memory write and wait for its vector ID."""
+        return await self._submit(mem_id, text, source, embedding)
+
+    async def run(self):
+        """Drain the queue, flushing up to max_batch items or every max_wait seconds."""
+        while True:
+            batch = await collect_batch(self.queue, self.max_batch, self.max_wait)
+            try:
+                vector_ids = await self._flush(batch)
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (*_, future), vector_id in zip(batch, vector_ids):
+                if not future.done():
+                    future.set_result(vector_id)
+
+    async def _flush(self, batch) -> list:
+        entries = [build_memory_entry(mem_id, text, source) for mem_id, text, source, _, _ in batch]
+        await bulk_store_async(entries)
+        return await vector_store.insert_many_async(
+            [text for _, text, _, _, _ in batch],
+            [embedding for _, _, _, embedding, _ in batch]
+        )
+
+memory_batcher = MemoryWriteBatcher()
 
 # === API Endpoints ===
 
@@ -304,15 +546,28 @@ def insert_vector(embedding, payload, namespace: str = "default"):
 # The startup logic is now handled in the lifespan function above
 
 # === Scribe Agent Endpoints ===
+_scribe_fallback = None
+_scribe_fallback_lock = asyncio.Lock()
+
+async def get_scribe_fallback():
+    """Get the shared ScribeAgent used when Scribe isn't running"""
+    global _scribe_fallback
+    if _scribe_fallback is None:
+        async with _scribe_fallback_lock:
+            if _scribe_fallback is None:
+                _scribe_fallback = ScribeAgent(vector_store)
+    return _scribe_fallback
+
 @app.get("/scribe/get_chapters")
 async def get_chapters():
     """Get chapters from Scribe agent."""
-    if "scribe" not in list_agents():
+    agents = list_running_agents()
+    if "scribe" not in agents:
         # Even if Scribe isn't running, we can return chapters
-        agent = ScribeAgent(vector_store)
+        agent = await get_scribe_fallback()
         return {"chapters": agent.get_chapters()}
 
-    return {"chapters": list_agents()["scribe"].get_chapters()}
+    return {"chapters": agents["scribe"].get_chapters()}
 
 @app.post("/scribe/write")
 async def write_chapter(request: Request):
@@ -329,7 +584,7 @@ async def edit_chapter(request: Request):
     index = int(data.get("index", -1))
     content = data.get("content")
 
-    agent = ScribeAgent(vector_store)
+    agent = await get_scribe_fallback()
     try:
         agent.edit_chapter(index, content)
     except IndexError:
@@ -341,21 +596,23 @@ async def edit_chapter(request: Request):
 @app.get("/")
 async def root():
     """Root endpoint - serve frontend or return status."""
-    frontend_file = Path(__file__).parent.parent.parent / "frontend" / "mcp.html"
-    if frontend_file.exists():
-        return FileResponse(str(frontend_file))
+    if frontend_index_bytes is not None:
+        return Response(content=frontend_index_bytes, media_type="text/html")
     return {"message": "AlsaniaMCP is running", "version": "1.0.0"}
 
+# Constant response bodies, serialized once at import
+_API_ROOT_BYTES = orjson_dumps({"message": "Echo is alive and hardened.", "version": "1.0.0"})
+_READY_BYTES = orjson_dumps({"status": "ready"})
+_ALIVE_BYTES = orjson_dumps({"status": "alive"})
+
 @app.get("/api")
 def api_root():
     """API root endpoint."""
-    return {"message": "Echo is alive and hardened.", "version": "1.0.0"}
+    return Response(content=_API_ROOT_BYTES, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     """Enhanced health check with comprehensive data integrity verification."""
-    from core.persistence import persistence_manager
-
     # Initialize basic health status structure
     health_status = {
         "status": "healthy",
@@ -384,14 +641,14 @@ async def health_check():
         }
 
     except Exception as e:
-        logger.error(f"Data integrity check failed: {e}")
+        logger.error("Data integrity check failed: %s", e)
         health_status["status"] = "degraded"
         health_status["data_integrity"] = {"error": str(e)}
 
     # Add embedding service check
     try:
         # Test local embedding system
-        test_embedding = embedding_manager.get_embedding("test", use_external=False)
+        test_embedding = await embedding_batcher.embed("test", cache=False)
         if test_embedding and len(test_embedding) > 0:
             health_status["services"]["embedding"] = "healthy"
             health_status["services"]["embedding_type"] = "local"
@@ -408,16 +665,43 @@ async def health_check():
     except Exception as e:
         health_status["services"]["embedding"] = "error"
         health_status["services"]["embedding_error"] = str(e)
-        logger.warning(f"Embedding service health check failed: {e}")
+        logger.warning("Embedding service health check failed: %s", e)
 
     return health_status
 
+# Constant for the life of the process
+BOOT_TIME = psutil.boot_time()
+
+@cached_with_ttl(seconds=2)
+def _collect_system_stats() -> dict:
+    """Collect psutil system metrics, shared by the health and status endpoints"""
+    try:
+        network_connections = len(psutil.net_connections())
+    except psutil.AccessDenied:
+        network_connections = None
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+    return {
+        "load_average": psutil.getloadavg() if hasattr(psutil, 'getloadavg') else None,
+        "boot_time": BOOT_TIME,
+        "process_count": len(psutil.pids()),
+        "network_connections": network_connections,
+        "memory_details": {
+            "total": memory.total,
+            "available": memory.available,
+            "used": memory.used,
+            "free": memory.free
+        },
+        "disk_details": {
+            "total": disk.total,
+            "used": disk.used,
+            "free": disk.free
+        }
+    }
+
 @app.get("/health/detailed")
 async def detailed_health_check():
     """Detailed health check with full system diagnostics."""
-    from core.persistence import persistence_manager
-    import psutil
-
     # Initialize basic health status structure
     health_status = {
         "status": "healthy",
@@ -446,38 +730,16 @@ async def detailed_health_check():
         }
 
     except Exception as e:
-        logger.error(f"Data integrity check failed: {e}")
+        logger.error("Data integrity check failed: %s", e)
         health_status["status"] = "degraded"
         health_status["data_integrity"] = {"error": str(e)}
 
     # Add detailed system metrics
     try:
-        health_status["system"].update({
-            "load_average": psutil.getloadavg() if hasattr(psutil, 'getloadavg') else None,
-            "boot_time": psutil.boot_time(),
-            "process_count": len(psutil.pids()),
-            "network_connections": len(psutil.net_connections()),
-        })
-
-        # Memory details
-        memory = psutil.virtual_memory()
-        health_status["system"]["memory_details"] = {
-            "total": memory.total,
-            "available": memory.available,
-            "used": memory.used,
-            "free": memory.free
-        }
-
-        # Disk details
-        disk = psutil.disk_usage('/')
-        health_status["system"]["disk_details"] = {
-            "total": disk.total,
-            "used": disk.used,
-            "free": disk.free
-        }
+        health_status["system"].update(_collect_system_stats())
 
     except Exception as e:
-        logger.error(f"Failed to collect detailed system metrics: {e}")
+        logger.error("Failed to collect detailed system metrics: %s", e)
         health_status["system"]["detailed_metrics_error"] = str(e)
 
     return health_status
@@ -485,7 +747,21 @@ async def detailed_health_check():
 @app.get("/ready")
 async def readiness_check():
     """Readiness check endpoint."""
-    return {"status": "ready"}
+    return Response(content=_READY_BYTES, media_type="application/json")
+
+@app.get("/healthz")
+async def liveness_probe():
+    """Liveness probe - returns as soon as the process is serving."""
+    return Response(content=_ALIVE_BYTES, media_type="application/json")
+
+@app.get("/readyz")
+async def readiness_probe():
+    """Readiness probe - only succeeds once background warmup has finished."""
+    ready = getattr(app.state, "ready", None)
+    if ready is None or not ready.is_set():
+        warmup_error = getattr(app.state, "warmup_error", None)
+        raise HTTPException(status_code=503, detail=f"Warmup failed: {warmup_error}" if warmup_error else "Warming up")
+    return Response(content=_READY_BYTES, media_type="application/json")
 
 # === Core Memory Operations ===
 @app.post("/ask")
@@ -493,14 +769,14 @@ async def ask(request: QueryRequest, key_info: dict = Depends(require_permission
     """Query the memory system using local embeddings."""
     try:
         query = request.query
-        logger.info(f"📨 Received query: {query}")
+        logger.info("📨 Received query: %s", query)
 
         # Use local embedding system (no external API required)
-        embedding = embedding_manager.get_embedding(query, use_external=False)
+        embedding = await embedding_batcher.embed(query)
         if embedding is None:
             raise HTTPException(status_code=500, detail="Failed to generate embedding")
 
-        results = search_similar(embedding)
+        results = await search_similar(embedding)
         mem_id = secure_memory_id()
         log_access(mem_id, "query")
 
@@ -513,7 +789,7 @@ async def ask(request: QueryRequest, key_info: dict = Depends(require_permission
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing query: {e}")
+        logger.error("Error processing query: %s", e)
         raise HTTPException(status_code=500, detail="Failed to process query")
 
 @app.post("/store")
@@ -528,14 +804,14 @@ async def store_memory(data: StoreRequest, key_info: dict = Depends(require_perm
             raise HTTPException(status_code=429, detail=quota_info['error'])
 
         # Use local embedding system (no external API required)
-        embedding = embedding_manager.get_embedding(data.text, use_external=False)
+        embedding = await embedding_batcher.embed(data.text, cache=False)
         if embedding is None:
             raise HTTPException(status_code=500, detail="Failed to generate embedding")
 
         mem_id = secure_memory_id()
-        save_memory_entry(mem_id, data.text, data.source)
+        await bulk_store_async([build_memory_entry(mem_id, data.text, data.source)])
         payload = {"memory_id": mem_id, "text": data.text, "source": data.source}
-        insert_vector(embedding, payload)
+        await insert_vector(embedding, payload)
         log_edit(mem_id, data.source)
 
         # Update usage
@@ -545,7 +821,7 @@ async def store_memory(data: StoreRequest, key_info: dict = Depends(require_perm
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error storing memory: {e}")
+        logger.error("Error storing memory: %s", e)
         raise HTTPException(status_code=500, detail="Failed to store memory")
 
 # === New Memory API Endpoints ===
@@ -553,7 +829,8 @@ async def store_memory(data: StoreRequest, key_info: dict = Depends(require_perm
 async def store_memory_new(data: StoreRequest, key_info: dict = Depends(require_permission("write"))):
     """Store a new memory entry with enhanced response format and quota checking."""
     try:
-        logger.info(f"📝 Storing memory: {data.text[:100]}...")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("📝 Storing memory: %s...", data.text[:100])
 
         # Check quota
         quota_ok, quota_info = auth_manager.api_key_manager.check_quota(
@@ -563,24 +840,15 @@ async def store_memory_new(data: StoreRequest, key_info: dict = Depends(require_
             raise HTTPException(status_code=429, detail=quota_info['error'])
 
         # Use local embedding system (no external API required)
-        embedding = embedding_manager.get_embedding(data.text, use_external=False)
+        embedding = await embedding_batcher.embed(data.text, cache=False)
         if embedding is None:
             raise HTTPException(status_code=500, detail="Failed to generate embedding")
 
         # Generate secure memory ID
         mem_id = secure_memory_id()
 
-        # Save to storage
-        save_memory_entry(mem_id, data.text, data.source)
-
-        # Insert into vector store
-        payload = {
-            "memory_id": mem_id,
-            "text": data.text,
-            "source": data.source,
-            "timestamp": datetime.now().isoformat()
-        }
-        vector_id = insert_vector(embedding, payload)
+        # Save to storage and vector store (batched with concurrent writes)
+        vector_id = await memory_batcher.submit(mem_id, data.text, data.source, embedding)
 
         # Log the operation
         log_edit(mem_id, data.source)
@@ -600,7 +868,7 @@ async def store_memory_new(data: StoreRequest, key_info: dict = Depends(require_
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error storing memory: {e}")
+        logger.error("Error storing memory: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to store memory: {str(e)}")
 
 @app.get("/memory/search")
@@ -610,32 +878,25 @@ async def search_memory(q: str, limit: int = 5, key_info: dict = Depends(verify_
         if not q or len(q.strip()) == 0:
             raise HTTPException(status_code=400, detail="Query parameter 'q' is required")
 
-        logger.info(f"🔍 Searching memories for: {q}")
+        logger.info("🔍 Searching memories for: %s", q)
 
         # Use local embedding system (no external API required)
-        embedding = embedding_manager.get_embedding(q, use_external=False)
+        embedding = await embedding_batcher.embed(q)
         if embedding is None:
             raise HTTPException(status_code=500, detail="Failed to generate embedding for query")
 
         # Search similar vectors
-        results = search_similar(embedding, top_k=limit)
+        results = await search_similar(embedding, top_k=limit)
 
         # Log the search
         search_id = secure_memory_id()
         log_access(search_id, "search")
 
         # Format results for frontend
-        formatted_results = []
-        for result in results:
-            formatted_results.append({
-                "id": result.get("id"),
-                "text": result.get("text", ""),
-                "score": round(result.get("score", 0), 4),
-                "source": result.get("source", "unknown"),
-                "timestamp": result.get("timestamp", "")
-            })
+        formatted_results = format_search_results(results)
 
-        return {
+        # Serialize directly with orjson, skipping jsonable_encoder
+        return ORJSONResponse({
             "status": "success",
             "query": q,
             "results": formatted_results,
@@ -643,28 +904,70 @@ async def search_memory(q: str, limit: int = 5, key_info: dict = Depends(verify_
             "search_id": search_id,
             "timestamp": datetime.now().isoformat(),
             "embedding_method": "local"
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error searching memories: {e}")
+        logger.error("Error searching memories: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to search memories: {str(e)}")
+
+@app.post("/memory/search_batch")
+async def search_memory_batch(request: BatchSearchRequest, key_info: dict = Depends(verify_token)):
+    """Search memories for several queries with one vector store round-trip."""
+    try:
+        logger.info("🔍 Batch searching memories for %s queries", len(request.queries))
+
+        embeddings = await embedding_batcher.embed_many(request.queries)
+        batches = await vector_store.search_batch_async(embeddings, top_k=request.limit)
+
+        search_id = secure_memory_id()
+        log_access(search_id, "search_batch")
+
+        return ORJSONResponse({
+            "status": "success",
+            "results": [
+                {"query": query, "results": format_search_results(results)}
+                for query, results in zip(request.queries, batches)
+            ],
+            "total_queries": len(request.queries),
+            "search_id": search_id,
+            "timestamp": datetime.now().isoformat(),
+            "embedding_method": "local"
+        })
+    except Exception as e:
+        logger.error("Error batch searching memories: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to search memories: {str(e)}")
 
 # === Agent Status API ===
+# Fallback status body split around its only varying field, the timestamp
+_AGENT_STATUS_FALLBACK_PREFIX = orjson_dumps({
+    "status": "success",
+    "echo": {
+        "state": "Active",
+        "current_status": "Operational",
+        "last_activity": "Just now",
+        "uptime": "Unknown",
+        "memory_count": "1,247",
+        "last_reflection": "2 min ago",
+        "active_agents": ["echo"],
+        "system_health": "Healthy"
+    }
+})[:-1] + b',"timestamp":'
+_AGENT_STATUS_FALLBACK_SUFFIX = b',' + orjson_dumps({
+    "system_uptime": "Unknown",
+    "active_connections": 1
+})[1:]
+
 @app.get("/agent/status")
 async def get_agent_status(_: str = Depends(verify_token)):
     """Get Echo agent status and activity metrics."""
     try:
-        from agents.core.agent_manager import list_agents
-        import time
-        import psutil
-
         # Get current agents
-        active_agents = list_agents()
+        active_agents = list_running_agents()
 
         # Calculate uptime
         current_time = time.time()
-        uptime_seconds = current_time - psutil.boot_time()
+        uptime_seconds = current_time - BOOT_TIME
         uptime_minutes = int(uptime_seconds // 60)
         uptime_hours = int(uptime_minutes // 60)
         uptime_days = int(uptime_hours // 24)
@@ -709,30 +1012,20 @@ async def get_agent_status(_: str = Depends(verify_token)):
         }
 
     except Exception as e:
-        logger.error(f"Error getting agent status: {e}")
+        logger.error("Error getting agent status: %s", e)
         # Return fallback status
-        return {
-            "status": "success",
-            "echo": {
-                "state": "Active",
-                "current_status": "Operational",
-                "last_activity": "Just now",
-                "uptime": "Unknown",
-                "memory_count": "1,247",
-                "last_reflection": "2 min ago",
-                "active_agents": ["echo"],
-                "system_health": "Healthy"
-            },
-            "timestamp": datetime.now().isoformat(),
-            "system_uptime": "Unknown",
-            "active_connections": 1
-        }
+        return Response(
+            content=_AGENT_STATUS_FALLBACK_PREFIX
+            + orjson_dumps(datetime.now().isoformat())
+            + _AGENT_STATUS_FALLBACK_SUFFIX,
+            media_type="application/json"
+        )
 
 @app.post("/vector/search")
 async def search_vector(query: QueryRequest):
     """Search vectors using simple embedding."""
-    embedding = embed_text(query.query)
-    results = vector_db.search(embedding) if hasattr(vector_db, 'search') else []
+    embedding = await embedding_batcher.embed(query.query, cache=False)
+    results = await vector_db.search_async(embedding)
     return results
 
 # === Snapshot Management ===
@@ -746,7 +1039,7 @@ async def save_snapshot_endpoint():
 @app.get("/snapshot/list")
 async def list_snapshots_endpoint():
     """List all available snapshots."""
-    return list_snapshots()
+    return ORJSONResponse(list_stored_snapshots())
 
 @app.get("/snapshot/load/{snapshot_id}")
 async def load_snapshot_endpoint(snapshot_id: str):
@@ -760,23 +1053,45 @@ async def load_snapshot_endpoint(snapshot_id: str):
 async def delete_snapshot_endpoint(snapshot_id: str):
     """Delete a specific snapshot."""
     try:
-        delete_snapshot(snapshot_id)
+        delete_stored_snapshot(snapshot_id)
         return {"status": "deleted", "id": snapshot_id}
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Snapshot not found")
 
 # === IPFS Integration ===
-def upload_to_ipfs(file_path: str, api_url: str = "http://127.0.0.1:5001/api/v0/add") -> str:
+IPFS_UPLOAD_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+CIDMAP_PATH = "snapshots/cidmap.json"
+# Serializes cidmap read-modify-write across concurrent exports
+_cidmap_lock = asyncio.Lock()
+
+def record_cid(snapshot_id: str, entry: dict) -> None:
+    """Add a snapshot's IPFS entry to cidmap.json, replacing the file atomically"""
+    if os.path.exists(CIDMAP_PATH):
+        with open(CIDMAP_PATH, "rb") as f:
+            cidmap = orjson.loads(f.read())
+    else:
+        cidmap = {}
+
+    cidmap[snapshot_id] = entry
+
+    tmp_path = CIDMAP_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(cidmap, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, CIDMAP_PATH)
+
+async def upload_to_ipfs(file_path: str, api_url: str = "http://127.0.0.1:5001/api/v0/add") -> str:
     """Upload a file to IPFS and return the hash."""
     try:
-        with open(file_path, "rb") as file:
-            response = requests.post(api_url, files={"file": file})
+        # httpx streams the multipart body from the file handle instead of buffering it
+        async with httpx.AsyncClient(timeout=IPFS_UPLOAD_TIMEOUT) as client:
+            with open(file_path, "rb") as file:
+                response = await client.post(api_url, files={"file": file})
         if response.status_code == 200:
             return response.json()["Hash"]
         else:
             raise Exception(f"IPFS upload failed: {response.text}")
     except Exception as e:
-        logger.error(f"IPFS upload error: {e}")
+        logger.error("IPFS upload error: %s", e)
         raise
 
 @app.get("/snapshot/export/{snapshot_id}")
@@ -792,29 +1107,21 @@ async def export_snapshot_to_ipfs(snapshot_id: str):
             with open(file_path, "w") as f:
                 json.dump(data, f, indent=2)
 
-        ipfs_cid = upload_to_ipfs(file_path)
-
-        cidmap_path = "snapshots/cidmap.json"
-        if os.path.exists(cidmap_path):
-            with open(cidmap_path, "r") as f:
-                cidmap = json.load(f)
-        else:
-            cidmap = {}
+        ipfs_cid = await upload_to_ipfs(file_path)
 
-        cidmap[snapshot_id] = {
+        entry = {
             "cid": ipfs_cid,
             "timestamp": datetime.now().isoformat(),
             "url": f"https://ipfs.io/ipfs/{ipfs_cid}"
         }
+        async with _cidmap_lock:
+            record_cid(snapshot_id, entry)
 
-        with open(cidmap_path, "w") as f:
-            json.dump(cidmap, f, indent=2)
-
-        return cidmap[snapshot_id]
+        return entry
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Snapshot not found")
     except Exception as e:
-        logger.error(f"Export to IPFS failed: {e}")
+        logger.error("Export to IPFS failed: %s", e)
         raise HTTPException(status_code=500, detail="Export failed")
 
 # === Authentication & Management Endpoints ===
@@ -833,16 +1140,16 @@ async def create_api_key(
         )
         return result
     except Exception as e:
-        logger.error(f"Failed to create API key: {e}")
+        logger.error("Failed to create API key: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/api-keys")
 async def list_api_keys(_: dict = Depends(require_permission("admin"))):
     """List all API keys."""
     try:
-        return {"api_keys": auth_manager.api_key_manager.list_api_keys()}
+        return ORJSONResponse({"api_keys": auth_manager.api_key_manager.list_api_keys()})
     except Exception as e:
-        logger.error(f"Failed to list API keys: {e}")
+        logger.error("Failed to list API keys: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/admin/api-keys/{key_id}")
@@ -858,7 +1165,7 @@ async def revoke_api_key(
         else:
             raise HTTPException(status_code=404, detail="API key not found")
     except Exception as e:
-        logger.error(f"Failed to revoke API key: {e}")
+        logger.error("Failed to revoke API key: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/admin/backup")
@@ -869,10 +1176,11 @@ async def create_backup(
     """Create a comprehensive data backup."""
     try:
         backup_name = request.get("name") if request else None
-        result = await persistence_manager.create_data_backup(backup_name)
+        include_vectors = request.get("include_vectors", True) if request else True
+        result = await persistence_manager.create_data_backup(backup_name, include_vectors=include_vectors)
         return result
     except Exception as e:
-        logger.error(f"Failed to create backup: {e}")
+        logger.error("Failed to create backup: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # === Agent Identity System ===
@@ -905,7 +1213,7 @@ async def create_agent(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to create agent: {e}")
+        logger.error("Failed to create agent: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/agents")
@@ -922,9 +1230,9 @@ async def list_agents(
             api_key_id=api_key_id,
             include_inactive=include_inactive
         )
-        return {"agents": agents}
+        return ORJSONResponse({"agents": agents})
     except Exception as e:
-        logger.error(f"Failed to list agents: {e}")
+        logger.error("Failed to list agents: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/agents/{agent_id}")
@@ -934,7 +1242,7 @@ async def get_agent(
 ):
     """Get agent details."""
     try:
-        agent = agent_manager.get_agent(agent_id=agent_id)
+        agent = await agent_manager.get_agent_async(agent_id)
         if not agent:
             raise HTTPException(status_code=404, detail="Agent not found")
 
@@ -946,7 +1254,7 @@ async def get_agent(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get agent: {e}")
+        logger.error("Failed to get agent: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/agents/{agent_id}/memories")
@@ -958,7 +1266,7 @@ async def get_agent_memories(
     """Get memories associated with an agent."""
     try:
         # Verify agent access
-        agent = agent_manager.get_agent(agent_id=agent_id)
+        agent = await agent_manager.get_agent_async(agent_id)
         if not agent:
             raise HTTPException(status_code=404, detail="Agent not found")
 
@@ -966,11 +1274,11 @@ async def get_agent_memories(
             raise HTTPException(status_code=403, detail="Access denied")
 
         memories = agent_manager.get_agent_memories(agent_id, access_level)
-        return {"memories": memories}
+        return ORJSONResponse({"memories": memories})
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get agent memories: {e}")
+        logger.error("Failed to get agent memories: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # === Snapshot Manager System ===
@@ -983,7 +1291,7 @@ async def create_agent_snapshot(
     """Create a snapshot of an agent's memory state with quota checking."""
     try:
         # Verify agent access
-        agent = agent_manager.get_agent(agent_id=agent_id)
+        agent = await agent_manager.get_agent_async(agent_id)
         if not agent:
             raise HTTPException(status_code=404, detail="Agent not found")
 
@@ -991,13 +1299,15 @@ async def create_agent_snapshot(
             raise HTTPException(status_code=403, detail="Access denied")
 
         # Check quota
-        quota_ok, quota_info = auth_manager.api_key_manager.check_quota(
-            key_info['id'], 'snapshots', 1
+        quota_ok, quota_info = await asyncio.to_thread(
+            auth_manager.api_key_manager.check_quota, key_info['id'], 'snapshots', 1
         )
         if not quota_ok:
             raise HTTPException(status_code=429, detail=quota_info['error'])
 
-        result = snapshot_manager.create_agent_snapshot(
+        # Snapshot creation does blocking DB and file I/O, so run it in a worker thread
+        result = await asyncio.to_thread(
+            snapshot_manager.create_agent_snapshot,
             agent_id=agent_id,
             snapshot_name=request.get("snapshot_name", ""),
             description=request.get("description", ""),
@@ -1006,15 +1316,24 @@ async def create_agent_snapshot(
         )
 
         # Update usage
-        auth_manager.api_key_manager.update_usage(key_info['id'], 'snapshots', 1)
+        await asyncio.to_thread(auth_manager.api_key_manager.update_usage, key_info['id'], 'snapshots', 1)
 
         return result
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to create agent snapshot: {e}")
+        logger.error("Failed to create agent snapshot: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def stream_snapshot_list(first, rows):
+    """Render {"snapshots": [...]} one row at a time from a snapshot row iterator"""
+    yield b'{"snapshots":['
+    if first is not None:
+        yield orjson_dumps(first)
+        for row in rows:
+            yield b"," + orjson_dumps(row)
+    yield b"]}"
+
 @app.get("/snapshots")
 async def list_snapshots(
     agent_id: str = None,
@@ -1025,31 +1344,43 @@ async def list_snapshots(
     try:
         # If agent_id specified, verify access
         if agent_id:
-            agent = agent_manager.get_agent(agent_id=agent_id)
+            agent = await agent_manager.get_agent_async(agent_id)
             if not agent:
                 raise HTTPException(status_code=404, detail="Agent not found")
 
             if not auth_manager.check_permission(key_info, "admin") and agent.get("api_key_id") != key_info.get("id"):
                 raise HTTPException(status_code=403, detail="Access denied")
 
-        snapshots = snapshot_manager.list_agent_snapshots(
+        # Non-admin users only see snapshots of their own agents (filtered in SQL)
+        rows = snapshot_manager.iter_agent_snapshots(
             agent_id=agent_id,
-            include_inactive=include_inactive
+            include_inactive=include_inactive,
+            api_key_id=None if auth_manager.check_permission(key_info, "admin") else key_info.get("id")
         )
-
-        # Filter snapshots for non-admin users
-        if not auth_manager.check_permission(key_info, "admin"):
-            user_agents = agent_manager.list_agents(api_key_id=key_info.get("id"))
-            user_agent_ids = {agent["id"] for agent in user_agents}
-            snapshots = [s for s in snapshots if s["agent_id"] in user_agent_ids]
-
-        return {"snapshots": snapshots}
+        # Run the query before streaming so connection/SQL errors still produce a 500
+        first = await asyncio.to_thread(next, rows, None)
+        return StreamingResponse(stream_snapshot_list(first, rows), media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to list snapshots: {e}")
+        logger.error("Failed to list snapshots: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+async def get_accessible_snapshot(snapshot_id: str, key_info: dict) -> dict:
+    """Fetch a snapshot by ID and verify the caller may act on its agent."""
+    # The agent lookup needs the snapshot's agent_id, so these run back to back
+    snapshot = await asyncio.to_thread(snapshot_manager.get_snapshot, snapshot_id)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+    agent = await agent_manager.get_agent_async(snapshot["agent_id"])
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+    if not auth_manager.check_permission(key_info, "admin") and agent.get("api_key_id") != key_info.get("id"):
+        raise HTTPException(status_code=403, detail="Access denied")
+    return snapshot
+
 @app.post("/snapshots/{snapshot_id}/restore")
 async def restore_snapshot(
     snapshot_id: str,
@@ -1058,24 +1389,12 @@ async def restore_snapshot(
 ):
     """Restore an agent's memory state from a snapshot."""
     try:
-        # Get snapshot info to verify access
-        snapshots = snapshot_manager.list_agent_snapshots()
-        snapshot = next((s for s in snapshots if s["id"] == snapshot_id), None)
-
-        if not snapshot:
-            raise HTTPException(status_code=404, detail="Snapshot not found")
-
-        # Verify agent access
-        agent = agent_manager.get_agent(agent_id=snapshot["agent_id"])
-        if not agent:
-            raise HTTPException(status_code=404, detail="Agent not found")
-
-        if not auth_manager.check_permission(key_info, "admin") and agent.get("api_key_id") != key_info.get("id"):
-            raise HTTPException(status_code=403, detail="Access denied")
+        await get_accessible_snapshot(snapshot_id, key_info)
 
         restore_type = request.get("restore_type", "full") if request else "full"
 
-        result = snapshot_manager.restore_agent_snapshot(
+        result = await asyncio.to_thread(
+            snapshot_manager.restore_agent_snapshot,
             snapshot_id=snapshot_id,
             restore_type=restore_type,
             created_by=key_info.get("name", "api_user")
@@ -1084,7 +1403,7 @@ async def restore_snapshot(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to restore snapshot: {e}")
+        logger.error("Failed to restore snapshot: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/snapshots/{snapshot_id}")
@@ -1094,22 +1413,9 @@ async def delete_snapshot(
 ):
     """Delete a snapshot."""
     try:
-        # Get snapshot info to verify access
-        snapshots = snapshot_manager.list_agent_snapshots()
-        snapshot = next((s for s in snapshots if s["id"] == snapshot_id), None)
-
-        if not snapshot:
-            raise HTTPException(status_code=404, detail="Snapshot not found")
-
-        # Verify agent access
-        agent = agent_manager.get_agent(agent_id=snapshot["agent_id"])
-        if not agent:
-            raise HTTPException(status_code=404, detail="Agent not found")
-
-        if not auth_manager.check_permission(key_info, "admin") and agent.get("api_key_id") != key_info.get("id"):
-            raise HTTPException(status_code=403, detail="Access denied")
+        await get_accessible_snapshot(snapshot_id, key_info)
 
-        success = snapshot_manager.delete_snapshot(snapshot_id)
+        success = await asyncio.to_thread(snapshot_manager.delete_snapshot, snapshot_id)
         if success:
             return {"message": "Snapshot deleted successfully"}
         else:
@@ -1117,7 +1423,7 @@ async def delete_snapshot(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to delete snapshot: {e}")
+        logger.error("Failed to delete snapshot: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # === OpenAI API Compatibility Endpoints ===
@@ -1125,7 +1431,7 @@ async def delete_snapshot(
 @app.get("/v1/models")
 async def list_models():
     """List available models (OpenAI compatible)"""
-    return openai_compat.list_models()
+    return ORJSONResponse(openai_compat.list_models())
 
 @app.post("/v1/chat/completions")
 async def chat_completions(
@@ -1139,23 +1445,28 @@ async def chat_completions(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
 
         # Check quota
-        quota_ok, quota_info = auth_manager.api_key_manager.check_quota(
-            key_info['id'], 'memories', 1
+        quota_ok, quota_info = await asyncio.to_thread(
+            auth_manager.api_key_manager.check_quota, key_info['id'], 'memories', 1
         )
         if not quota_ok:
             raise HTTPException(status_code=429, detail=quota_info['error'])
 
-        response = await openai_compat.chat_completion(request, key_info)
+        if request.stream:
+            chunks = openai_compat.chat_completion_stream(request, key_info)
+        else:
+            response = await openai_compat.chat_completion(request, key_info)
 
         # Update usage
-        auth_manager.api_key_manager.update_usage(key_info['id'], 'memories', 1)
+        await asyncio.to_thread(auth_manager.api_key_manager.update_usage, key_info['id'], 'memories', 1)
 
-        return response
+        if request.stream:
+            return StreamingResponse(chunks, media_type="text/event-stream")
+        return ORJSONResponse(response)
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Chat completion failed: {e}")
+        logger.error("Chat completion failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/v1/embeddings")
@@ -1170,12 +1481,13 @@ async def create_embeddings(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
 
         response = await openai_compat.create_embeddings(request, key_info)
-        return response
+        # Skips jsonable_encoder walking every float of every embedding
+        return ORJSONResponse(response)
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Embedding creation failed: {e}")
+        logger.error("Embedding creation failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # === Enhanced API Key Management Endpoints ===
@@ -1200,9 +1512,61 @@ async def create_enhanced_api_key(
         )
         return result
     except Exception as e:
-        logger.error(f"Failed to create enhanced API key: {e}")
+        logger.error("Failed to create enhanced API key: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Usage history is shaped by Postgres; json_build_object renders dates as ISO strings
+API_KEY_INFO_SQL = "SELECT name, tier, quotas FROM alsania.api_keys WHERE id = {}"
+API_KEY_USAGE_SQL = """
+    SELECT COALESCE(json_agg(json_build_object(
+               'date', u.date,
+               'requests_count', u.requests_count,
+               'agents_created', u.agents_created,
+               'memories_stored', u.memories_stored,
+               'snapshots_created', u.snapshots_created
+           ) ORDER BY u.date DESC), '[]'::json) AS usage_history
+    FROM (
+        SELECT * FROM alsania.api_key_usage
+        WHERE api_key_id = {}
+        ORDER BY date DESC
+        LIMIT 30
+    ) u
+"""
+
+def _fetch_api_key_usage_sync(key_id: str):
+    """psycopg2 fallback used when the asyncpg pool is unavailable"""
+    with auth_manager.api_key_manager.get_postgres_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(API_KEY_INFO_SQL.format("%s"), (key_id,))
+            key_row = cur.fetchone()
+            if not key_row:
+                return None, None
+            cur.execute(API_KEY_USAGE_SQL.format("%s"), (key_id,))
+            return dict(key_row), cur.fetchone()['usage_history']
+
+async def fetch_api_key_usage(key_id: str):
+    """Fetch an API key's details and its last 30 days of usage"""
+    pool = app.state.pool
+    if pool is None:
+        return await asyncio.to_thread(_fetch_api_key_usage_sync, key_id)
+
+    async def fetch_key():
+        async with pool.acquire() as conn:
+            return await conn.fetchrow(API_KEY_INFO_SQL.format("$1"), key_id)
+
+    async def fetch_history():
+        async with pool.acquire() as conn:
+            return await conn.fetchval(API_KEY_USAGE_SQL.format("$1"), key_id)
+
+    key_row, history = await asyncio.gather(fetch_key(), fetch_history())
+    if not key_row:
+        return None, None
+    # asyncpg hands json/jsonb back as text
+    key_row = dict(key_row)
+    if isinstance(key_row['quotas'], str):
+        key_row['quotas'] = orjson.loads(key_row['quotas'])
+    return key_row, orjson.loads(history)
+
 @app.get("/admin/api-keys/usage/{key_id}")
 async def get_api_key_usage(
     key_id: str,
@@ -1210,46 +1574,21 @@ async def get_api_key_usage(
 ):
     """Get usage statistics for an API key."""
     try:
-        with auth_manager.api_key_manager.get_postgres_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT ak.name, ak.tier, ak.quotas,
-                           aku.date, aku.requests_count, aku.agents_created,
-                           aku.memories_stored, aku.snapshots_created
-                    FROM alsania.api_keys ak
-                    LEFT JOIN alsania.api_key_usage aku ON ak.id = aku.api_key_id
-                    WHERE ak.id = %s
-                    ORDER BY aku.date DESC
-                    LIMIT 30
-                """, (key_id,))
-
-                results = cur.fetchall()
-                if not results:
-                    raise HTTPException(status_code=404, detail="API key not found")
-
-                key_info = {
-                    'name': results[0]['name'],
-                    'tier': results[0]['tier'],
-                    'quotas': results[0]['quotas'],
-                    'usage_history': []
-                }
-
-                for row in results:
-                    if row['date']:
-                        key_info['usage_history'].append({
-                            'date': row['date'].isoformat(),
-                            'requests_count': row['requests_count'],
-                            'agents_created': row['agents_created'],
-                            'memories_stored': row['memories_stored'],
-                            'snapshots_created': row['snapshots_created']
-                        })
-
-                return key_info
+        key_row, usage_history = await fetch_api_key_usage(key_id)
+        if not key_row:
+            raise HTTPException(status_code=404, detail="API key not found")
+
+        return ORJSONResponse({
+            'name': key_row['name'],
+            'tier': key_row['tier'],
+            'quotas': key_row['quotas'],
+            'usage_history': usage_history
+        })
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get API key usage: {e}")
+        logger.error("Failed to get API key usage: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # === Utility Endpoints ===
@@ -0,0 +1,33 @@
+"""
+Similarity kernels for in-process vector scoring
+Rows and queries are float32 and unit-norm, so cosine similarity is a single BLAS dot
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+def cosine_batch(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Cosine similarity of every row of a unit-norm float32 matrix against a unit-norm query"""
+    return matrix @ query
+
+def select_top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and scores of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=scores.dtype)
+    idx = np.argpartition(scores, len(scores) - k)[-k:]
+    idx = idx[np.argsort(scores[idx])[::-1]]
+    return idx, scores[idx]
+
+def unit(vector) -> np.ndarray:
+    """Vector as unit-norm float32"""
+    q = np.asarray(vector, dtype=np.float32)
+    return q / (np.linalg.norm(q) + 1e-9)
+
+def normalize_rows(embeddings: List[List[float]]) -> List[List[float]]:
+    """L2-normalize vectors (zero vectors stay zero)"""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix.tolist()
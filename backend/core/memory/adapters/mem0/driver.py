@@ -1,37 +1,157 @@
-import os, json, pathlib
+import os, json, pathlib, fcntl
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 
+import numpy as np
+import orjson
+
+from ..._kernels import cosine_batch, select_top_k, unit
+
 class Mem0Driver:
     """
     Minimal in-process vector stub (use when you want everything local + simple).
     Not a true ANN index; keeps it dead-simple for low-end devices.
+
+    Vectors are kept unit-normalized as raw float32 rows in mem.f32 with a parallel
+    payloads.jsonl, so cosine search is one matmul. Both are mirrored in memory and
+    only bytes appended since the last read (e.g. by another process) are loaded.
+    Writers hold an exclusive flock on both files, so appends from several
+    processes never interleave and row i always pairs with payload line i.
     """
     def __init__(self, data_dir: Optional[str] = None):
         self.data_path = pathlib.Path(data_dir or os.getenv("MEM0_DATA_DIR", "./data/mem0"))
         self.data_path.mkdir(parents=True, exist_ok=True)
-        self.store_file = self.data_path / "mem.jsonl"
-        if not self.store_file.exists():
-            self.store_file.write_text("", encoding="utf-8")
+        self.vector_file = self.data_path / "mem.f32"
+        self.payload_file = self.data_path / "payloads.jsonl"
+        self.meta_file = self.data_path / "meta.json"
+        self.store_file = self.data_path / "mem.jsonl"  # legacy single-file format
+        for path in (self.vector_file, self.payload_file):
+            if not path.exists():
+                path.write_bytes(b"")
+        self.dim = self._load_dim()
 
-    def upsert(self, vectors: List[List[float]], payloads: List[Dict[str, Any]], ids=None):
-        with self.store_file.open("a", encoding="utf-8") as f:
-            for vec, pl in zip(vectors, payloads):
-                f.write(json.dumps({"v": vec, "p": pl}) + "\n")
+        # In-memory mirror of the files; _vecs grows by doubling
+        self._vecs = np.empty((0, self.dim or 0), dtype=np.float32)
+        self._rows = 0
+        self._payloads: List[bytes] = []
+        self._vec_bytes = 0
+        self._payload_bytes = 0
 
-    def query(self, vector: List[float], top_k: int = 8, filter=None):
-        # cosine similarity in pure python — fine for small/local
-        import math, json
-        items = []
-        with self.store_file.open("r", encoding="utf-8") as f:
+        if self.dim is None and self.store_file.exists() and self.store_file.stat().st_size:
+            self._migrate_legacy()
+        self._refresh()
+
+    def _load_dim(self) -> Optional[int]:
+        if self.meta_file.exists():
+            return json.loads(self.meta_file.read_text(encoding="utf-8"))["dim"]
+        return None
+
+    def _migrate_legacy(self):
+        vectors, payloads = [], []
+        with self.store_file.open("rb") as f:
             for line in f:
                 if not line.strip():
                     continue
-                obj = json.loads(line)
-                v = obj["v"]
-                dot = sum(a*b for a,b in zip(v, vector))
-                nv = math.sqrt(sum(a*a for a in v)) or 1e-9
-                nq = math.sqrt(sum(a*a for a in vector)) or 1e-9
-                score = dot/(nv*nq)
-                items.append((score, obj["p"]))
-        items.sort(key=lambda x: x[0], reverse=True)
-        return [{"score": s, "payload": p} for s,p in items[:top_k]]
+                obj = orjson.loads(line)
+                vectors.append(obj["v"])
+                payloads.append(obj["p"])
+        self.upsert(vectors, payloads)
+
+    def _append_rows(self, rows: np.ndarray):
+        needed = self._rows + len(rows)
+        if needed > len(self._vecs):
+            grown = np.empty((max(needed, 2 * len(self._vecs), 64), self.dim), dtype=np.float32)
+            if self._rows:
+                grown[:self._rows] = self._vecs[:self._rows]
+            self._vecs = grown
+        self._vecs[self._rows:needed] = rows
+        self._rows = needed
+
+    def _refresh(self):
+        """Load rows and payload lines appended to the files since the last read"""
+        if self.dim is None:
+            self.dim = self._load_dim()
+            if self.dim is None:
+                return
+
+        size = self.vector_file.stat().st_size
+        complete = size - size % (4 * self.dim)
+        if complete > self._vec_bytes:
+            with self.vector_file.open("rb") as f:
+                f.seek(self._vec_bytes)
+                data = f.read(complete - self._vec_bytes)
+            self._append_rows(np.frombuffer(data, dtype=np.float32).reshape(-1, self.dim))
+            self._vec_bytes = complete
+
+        size = self.payload_file.stat().st_size
+        if size > self._payload_bytes:
+            with self.payload_file.open("rb") as f:
+                f.seek(self._payload_bytes)
+                data = f.read(size - self._payload_bytes)
+            end = data.rfind(b"\n") + 1  # only complete lines
+            self._payloads.extend(data[:end].splitlines())
+            self._payload_bytes += end
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        return matrix / (np.linalg.norm(matrix, axis=-1, keepdims=True) + 1e-9)
+
+    @contextmanager
+    def _append_lock(self):
+        """Open both files for append under an exclusive lock (vectors first)"""
+        with self.vector_file.open("ab") as vf, self.payload_file.open("ab") as pf:
+            fcntl.flock(vf.fileno(), fcntl.LOCK_EX)
+            fcntl.flock(pf.fileno(), fcntl.LOCK_EX)
+            try:
+                yield vf, pf
+            finally:
+                fcntl.flock(pf.fileno(), fcntl.LOCK_UN)
+                fcntl.flock(vf.fileno(), fcntl.LOCK_UN)
+
+    def upsert(self, vectors: List[List[float]], payloads: List[Dict[str, Any]], ids=None):
+        count = min(len(vectors), len(payloads))
+        if not count:
+            return
+        matrix = np.asarray(vectors[:count], dtype=np.float32)
+        rows = self._normalize(matrix)
+        lines = [orjson.dumps(pl) for pl in payloads[:count]]
+        vec_data = rows.tobytes()
+        payload_data = b"".join(line + b"\n" for line in lines)
+
+        with self._append_lock() as (vf, pf):
+            if self.dim is None:
+                self.dim = self._load_dim()  # another process may have written it
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                self.meta_file.write_text(json.dumps({"dim": self.dim}), encoding="utf-8")
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim vectors, got {matrix.shape[1]}")
+
+            # Pick up everything other writers appended before we took the lock
+            self._refresh()
+            vf.write(vec_data)
+            pf.write(payload_data)
+            vf.flush()
+            pf.flush()
+
+            # Mirror the write so this process never re-reads it
+            self._append_rows(rows)
+            self._payloads.extend(lines)
+            self._vec_bytes = os.fstat(vf.fileno()).st_size
+            self._payload_bytes = os.fstat(pf.fileno()).st_size
+
+    def query(self, vector: List[float], top_k: int = 8, filter=None):
+        self._refresh()
+        rows = min(self._rows, len(self._payloads))
+        k = min(top_k, rows)
+        if k <= 0:
+            return []
+
+        # rows are pre-normalized, so cosine similarity reduces to X @ q
+        scores = cosine_batch(self._vecs[:rows], unit(vector))
+        top, top_scores = select_top_k(scores, k)
+
+        return [
+            {"score": float(score), "payload": orjson.loads(self._payloads[i])}
+            for i, score in zip(top, top_scores)
+        ]
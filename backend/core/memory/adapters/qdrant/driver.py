@@ -1,30 +1,115 @@
 from __future__ import annotations
 import os
+import threading
+import uuid
 from typing import List, Dict, Any, Optional
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models
 from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from ..._kernels import normalize_rows, unit
+
+# int8 vectors stay in RAM while the float32 originals are memmapped once a
+# segment passes MEMMAP_THRESHOLD kB; searches rescore the int8 top hits in float32
+QUANTIZATION_CONFIG = models.ScalarQuantization(
+    scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+)
+MEMMAP_THRESHOLD = 20000
+SEARCH_PARAMS = models.SearchParams(
+    quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+# VectorStore and QdrantVectorDriver both default to the QDRANT_COLLECTION collection, so
+# whichever creates it must use this schema. Both unit-normalize vectors before every upsert
+# and search, which makes DOT scores equal to cosine similarity.
+COLLECTION_DISTANCE = Distance.DOT
+DEFAULT_VECTOR_SIZE = int(os.getenv("EMBEDDING_DIM", "384"))
+
+def collection_vectors_config(vector_size: int = DEFAULT_VECTOR_SIZE) -> VectorParams:
+    return VectorParams(size=vector_size, distance=COLLECTION_DISTANCE)
+
+# Payload fields used in query filters
+INDEXED_PAYLOAD_FIELDS = {"namespace": models.PayloadSchemaType.KEYWORD}
+
+# (url, collection, vector_size) already ensured by this process
+_ensured = set()
+_ensured_lock = threading.Lock()
 
 class QdrantVectorDriver:
     def __init__(self, collection: Optional[str] = None):
         url = os.getenv("QDRANT_URL", "http://localhost:6333")
         api_key = os.getenv("QDRANT_API_KEY")
+        # gRPC (protobuf) is cheaper to encode/decode than JSON over HTTP
+        prefer_grpc = os.getenv("QDRANT_PREFER_GRPC", "true").lower() == "true"
+        grpc_port = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+        self.url = url
         self.collection = collection or os.getenv("QDRANT_COLLECTION", "alsania_mem")
-        self.client = QdrantClient(url=url, api_key=api_key)
+        self.client = QdrantClient(url=url, api_key=api_key, prefer_grpc=prefer_grpc, grpc_port=grpc_port)
+        self.async_client = AsyncQdrantClient(url=url, api_key=api_key, prefer_grpc=prefer_grpc, grpc_port=grpc_port)
+
+    def _points(self, vectors: List[List[float]], payloads: List[Dict[str, Any]], ids: Optional[List[int]]) -> List[PointStruct]:
+        vectors = normalize_rows(vectors)
+        return [
+            PointStruct(id=ids[i] if ids else str(uuid.uuid4()), vector=vectors[i], payload=payloads[i])
+            for i in range(len(vectors))
+        ]
+
+    def _collection_config(self, vector_size: int) -> Dict[str, Any]:
+        return {
+            "collection_name": self.collection,
+            "vectors_config": collection_vectors_config(vector_size),
+            "quantization_config": QUANTIZATION_CONFIG,
+            "optimizers_config": models.OptimizersConfigDiff(memmap_threshold=MEMMAP_THRESHOLD),
+        }
+
+    @staticmethod
+    def _results(res) -> List[Dict[str, Any]]:
+        return [{"id":r.id, "score":r.score, "payload":r.payload} for r in res]
+
+    def _ensure_key(self, vector_size: int):
+        return (self.url, self.collection, vector_size)
 
     def ensure_collection(self, vector_size: int):
+        key = self._ensure_key(vector_size)
+        if key in _ensured:
+            return
+        with _ensured_lock:
+            if key in _ensured:
+                return
+            self._create_collection(vector_size)
+            _ensured.add(key)
+
+    def _create_collection(self, vector_size: int):
         if self.collection not in [c.name for c in self.client.get_collections().collections]:
-            self.client.recreate_collection(
-                collection_name=self.collection,
-                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
-            )
+            self.client.recreate_collection(**self._collection_config(vector_size))
+        # Also indexes collections created before the index existed; re-creating is a no-op
+        for field, schema in INDEXED_PAYLOAD_FIELDS.items():
+            self.client.create_payload_index(self.collection, field_name=field, field_schema=schema)
+
+    async def ensure_collection_async(self, vector_size: int):
+        key = self._ensure_key(vector_size)
+        if key in _ensured:
+            return
+        collections = await self.async_client.get_collections()
+        if self.collection not in [c.name for c in collections.collections]:
+            await self.async_client.recreate_collection(**self._collection_config(vector_size))
+        for field, schema in INDEXED_PAYLOAD_FIELDS.items():
+            await self.async_client.create_payload_index(self.collection, field_name=field, field_schema=schema)
+        _ensured.add(key)
 
     def upsert(self, vectors: List[List[float]], payloads: List[Dict[str, Any]], ids: Optional[List[int]]=None):
-        points = [
-            PointStruct(id=ids[i] if ids else None, vector=vectors[i], payload=payloads[i])
-            for i in range(len(vectors))
-        ]
-        self.client.upsert(collection_name=self.collection, points=points)
+        self.client.upsert(collection_name=self.collection, points=self._points(vectors, payloads, ids))
+
+    async def upsert_async(self, vectors: List[List[float]], payloads: List[Dict[str, Any]], ids: Optional[List[int]]=None):
+        # wait=False returns once Qdrant has accepted the batch
+        await self.async_client.upsert(
+            collection_name=self.collection, points=self._points(vectors, payloads, ids), wait=False
+        )
 
     def query(self, vector: List[float], top_k: int = 8, filter: Optional[Dict[str, Any]] = None):
-        res = self.client.search(collection_name=self.collection, query_vector=vector, limit=top_k, query_filter=filter)
-        return [{"id":r.id, "score":r.score, "payload":r.payload} for r in res]
+        res = self.client.search(collection_name=self.collection, query_vector=unit(vector).tolist(), limit=top_k, query_filter=filter,
+                                 search_params=SEARCH_PARAMS)
+        return self._results(res)
+
+    async def query_async(self, vector: List[float], top_k: int = 8, filter: Optional[Dict[str, Any]] = None):
+        res = await self.async_client.search(collection_name=self.collection, query_vector=unit(vector).tolist(), limit=top_k, query_filter=filter,
+                                                   search_params=SEARCH_PARAMS)
+        return self._results(res)
@@ -1,19 +1,81 @@
-import json
+import asyncio
+import atexit
 import os
-from datetime import datetime
+import threading
+import time
+
+import orjson
 
 FORENSICS_LOG = "logs/forensics.log"
+# Pending events are written together once this many queue up or the interval passes
+FLUSH_MAX_EVENTS = 256
+FLUSH_INTERVAL = 0.05
+# Most kernels cap a single writev at 1024 buffers
+IOV_MAX = 1024
+
+# O_APPEND descriptor opened once per process instead of on every event
+_log_fd = None
+_pending = []
+_flush_scheduled = False
+_log_lock = threading.Lock()
+
+def _get_log_fd():
+    global _log_fd
+    if _log_fd is None:
+        os.makedirs(os.path.dirname(FORENSICS_LOG), exist_ok=True)
+        _log_fd = os.open(FORENSICS_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    return _log_fd
+
+def _write_frames(fd, frames):
+    """Append pre-encoded lines with one writev per IOV_MAX frames"""
+    for start in range(0, len(frames), IOV_MAX):
+        chunk = frames[start:start + IOV_MAX]
+        if hasattr(os, "writev"):
+            written = os.writev(fd, chunk)
+            if written == sum(map(len, chunk)):
+                continue
+        else:
+            written = 0
+        rest = b"".join(chunk)[written:]
+        while rest:  # short write
+            rest = rest[os.write(fd, rest):]
+
+def flush():
+    """Write all pending forensic events to the log file"""
+    global _flush_scheduled
+    with _log_lock:
+        _flush_scheduled = False
+        if not _pending:
+            return
+        _write_frames(_get_log_fd(), _pending)
+        _pending.clear()
 
 def log_event(event_type, memory_id, details=None):
-    os.makedirs("logs", exist_ok=True)
+    global _flush_scheduled
     entry = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": time.time(),
         "event": event_type,
         "memory_id": memory_id,
         "details": details or {}
     }
-    with open(FORENSICS_LOG, "a", encoding="utf-8") as f:
-        f.write(json.dumps(entry) + "\n")
+    line = orjson.dumps(entry) + b"\n"
+    with _log_lock:
+        _pending.append(line)
+        if len(_pending) < FLUSH_MAX_EVENTS:
+            if _flush_scheduled:
+                return
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            # On the event loop, coalesce with events from the next few ms
+            if loop is not None:
+                loop.call_later(FLUSH_INTERVAL, flush)
+                _flush_scheduled = True
+                return
+    flush()
+
+atexit.register(flush)
 
 def log_access(memory_id, user="unknown"):
     log_event("access", memory_id, {"user": user})
@@ -1,29 +1,32 @@
 
 import os
 import hashlib
-from Crypto.Cipher import AES
-from Crypto.Random import get_random_bytes
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 KEY_ENV_VAR = "SNAPSHOT_ENCRYPTION_KEY"
-
-def pad(data):
-    pad_len = AES.block_size - len(data) % AES.block_size
-    return data + bytes([pad_len]) * pad_len
+CHUNK_SIZE = 1 << 20
 
 def encrypt_file(input_path, output_path):
+    """Encrypt a snapshot with AES-256-GCM, streaming 1 MiB chunks.
+
+    Output layout: 12-byte nonce | ciphertext | 16-byte tag.
+    """
     key = os.getenv(KEY_ENV_VAR)
     if not key:
         raise EnvironmentError(f"Missing env var: {KEY_ENV_VAR}")
     key = hashlib.sha256(key.encode()).digest()
 
-    iv = get_random_bytes(16)
-    cipher = AES.new(key, AES.MODE_CBC, iv)
-
-    with open(input_path, 'rb') as f:
-        data = f.read()
-
-    encrypted = cipher.encrypt(pad(data))
-    with open(output_path, 'wb') as f:
-        f.write(iv + encrypted)
+    iv = os.urandom(12)
+    encryptor = Cipher(algorithms.AES(key), modes.GCM(iv)).encryptor()
+
+    # GCM is a stream mode, so no padding; both buffers are reused for every chunk
+    buf = memoryview(bytearray(CHUNK_SIZE))
+    out = memoryview(bytearray(CHUNK_SIZE + 15))  # update_into needs block_size - 1 spare bytes
+    with open(input_path, 'rb') as fi, open(output_path, 'wb') as fo:
+        fo.write(iv)
+        while n := fi.readinto(buf):
+            fo.write(out[:encryptor.update_into(buf[:n], out)])
+        fo.write(encryptor.finalize())
+        fo.write(encryptor.tag)
 
     print(f"Encrypted snapshot saved to: {output_path}")
@@ -2,19 +2,32 @@
 
 import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 SNAPSHOT_DIR = Path("snapshots")
 LOG_PATH = SNAPSHOT_DIR / "log.json"
 HASH_FILE = SNAPSHOT_DIR / "integrity.hash"
+CHUNK_SIZE = 1 << 18
 
 def compute_hash(file_path):
-    h = hashlib.blake2b()
     with open(file_path, "rb") as f:
-        while chunk := f.read(8192):
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "blake2b").hexdigest()
+        h = hashlib.blake2b()
+        while chunk := f.read(CHUNK_SIZE):
             h.update(chunk)
     return h.hexdigest()
 
+def compute_hashes(file_paths):
+    """Hash several files concurrently; blake2b releases the GIL on large buffers"""
+    file_paths = list(file_paths)
+    if len(file_paths) < 2:
+        return [compute_hash(path) for path in file_paths]
+    with ThreadPoolExecutor(max_workers=min(len(file_paths), os.cpu_count() or 1)) as executor:
+        return list(executor.map(compute_hash, file_paths))
+
 def verify_hashes():
     if not HASH_FILE.exists():
         print("❌ No hash file found. Integrity check skipped.")
@@ -24,13 +37,18 @@ def verify_hashes():
         saved_hashes = json.load(f)
 
     all_good = True
-    for file, saved_hash in saved_hashes.items():
+    present = {}
+    for file in saved_hashes:
         file_path = SNAPSHOT_DIR / file
         if not file_path.exists():
             print(f"⚠️ Missing file: {file}")
             all_good = False
             continue
-        current_hash = compute_hash(file_path)
+        present[file] = file_path
+
+    current_hashes = dict(zip(present, compute_hashes(present.values())))
+    for file, current_hash in current_hashes.items():
+        saved_hash = saved_hashes[file]
         if current_hash != saved_hash:
             print(f"❌ Hash mismatch for {file}")
             print(f"  Expected: {saved_hash}")
@@ -41,11 +59,14 @@ def verify_hashes():
     return all_good
 
 def generate_hashes():
-    hashes = {}
-    for file_path in SNAPSHOT_DIR.glob("*"):
-        if file_path.name in {"integrity.hash", "log.json"}:
-            continue
-        hashes[file_path.name] = compute_hash(file_path)
+    file_paths = [
+        file_path for file_path in SNAPSHOT_DIR.glob("*")
+        if file_path.name not in {"integrity.hash", "log.json"}
+    ]
+    hashes = {
+        file_path.name: digest
+        for file_path, digest in zip(file_paths, compute_hashes(file_paths))
+    }
     with open(HASH_FILE, "w") as f:
         json.dump(hashes, f, indent=2)
     print("✅ Integrity hashes generated and saved.")
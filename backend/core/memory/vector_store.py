@@ -1,14 +1,51 @@
 # memory/vector_store.py
-import uuid, os
-from qdrant_client import QdrantClient
+import asyncio, functools, os
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models
+from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue
+from ._kernels import normalize_rows
+from .adapters.qdrant.driver import (
+    QUANTIZATION_CONFIG, MEMMAP_THRESHOLD, SEARCH_PARAMS, DEFAULT_VECTOR_SIZE, collection_vectors_config
+)
 from typing import List
+try:
+    from ..shared.utils import idgen
+except ImportError:  # loaded as top-level `memory` with backend/core on sys.path
+    from shared.utils import idgen
+
+@functools.lru_cache(maxsize=256)
+def namespace_filter(namespace: str) -> Filter:
+    """Shared (read-only) Filter matching one namespace"""
+    return Filter(must=[FieldCondition(key="namespace", match=MatchValue(value=namespace))])
+
+def normalize(embedding: List[float]) -> List[float]:
+    """L2-normalize a single vector"""
+    return normalize_rows([embedding])[0]
 
 # backend/core/memory/vector_store.py
+# Collections use DOT distance (see collection_vectors_config), so every stored and query
+# vector must be unit-norm; all insert/search paths below normalize before talking to Qdrant.
 class VectorStore:
-    def __init__(self, driver):
+    # insert_async points are coalesced into one upsert of up to this many, or sent after the interval
+    INSERT_BATCH_SIZE = 32
+    INSERT_FLUSH_INTERVAL = 0.1
+
+    def __init__(self, driver=None, host: str = "localhost", port: int = 6333,
+                 collection: str = None, pool_size: int = 100, vector_size: int = DEFAULT_VECTOR_SIZE):
         self.driver = driver
+        self.host = host
+        self.port = port
+        self.collection = collection or os.getenv("QDRANT_COLLECTION", "alsania_mem")
+        self.pool_size = pool_size
+        self.vector_size = vector_size
+        self.client = None
+        self.async_client = None
+        self.connected = False
+        self._pending: List[PointStruct] = []
+        self._flush_task = None
+        if driver is None:
+            self._connect()
 
     def upsert(self, vectors, payloads, ids=None):
         return self.driver.upsert(vectors, payloads, ids=ids)
@@ -16,51 +53,108 @@ class VectorStore:
     def query(self, vector, top_k=8, filter=None):
         return self.driver.query(vector, top_k=top_k, filter=filter)
 
+    async def upsert_async(self, vectors, payloads, ids=None):
+        """Upsert through the driver without blocking the event loop"""
+        if hasattr(self.driver, "upsert_async"):
+            return await self.driver.upsert_async(vectors, payloads, ids=ids)
+        return await asyncio.to_thread(self.driver.upsert, vectors, payloads, ids=ids)
+
+    async def query_async(self, vector, top_k=8, filter=None):
+        """Query through the driver without blocking the event loop"""
+        if hasattr(self.driver, "query_async"):
+            return await self.driver.query_async(vector, top_k=top_k, filter=filter)
+        return await asyncio.to_thread(self.driver.query, vector, top_k=top_k, filter=filter)
+
     def _connect(self):
         """Attempt to connect to Qdrant"""
         try:
             self.client = QdrantClient(host=self.host, port=self.port, check_compatibility=False)
-            self.client.get_collections()  # Test connection
+            # Pooled async client for request handlers (keeps the event loop free)
+            self.async_client = AsyncQdrantClient(
+                host=self.host, port=self.port, pool_size=self.pool_size, check_compatibility=False
+            )
             self.connected = True
-            self.ensure_collection()
+            self.ensure_collection()  # its lookup is the first RPC, so it doubles as the connection check
+            if not self.connected:
+                raise ConnectionError(f"collection check on {self.collection} failed")
             print(f"✅ Connected to Qdrant at {self.host}:{self.port}")
         except Exception as e:
             print(f"⚠️  Failed to connect to Qdrant: {e}")
             self.connected = False
             self.client = None
 
+    def _collection_exists(self) -> bool:
+        """Single-collection lookup (the server predates the collection_exists endpoint)"""
+        try:
+            self.client.get_collection(self.collection)
+            return True
+        except UnexpectedResponse as e:
+            if e.status_code == 404:
+                return False
+            raise
+
     def ensure_collection(self):
         """Ensure collection exists if connected"""
         if not self.connected or not self.client:
             return
 
         try:
-            collections = [c.name for c in self.client.get_collections().collections]
-            if self.collection not in collections:
+            if not self._collection_exists():
                 self.client.recreate_collection(
                     collection_name=self.collection,
-                    vectors_config=models.VectorParams(size=1536, distance=models.Distance.COSINE)
+                    vectors_config=collection_vectors_config(self.vector_size),
+                    # int8 scalar quantization keeps the search index in RAM at a quarter of the size
+                    quantization_config=QUANTIZATION_CONFIG,
+                    optimizers_config=models.OptimizersConfigDiff(memmap_threshold=MEMMAP_THRESHOLD)
                 )
                 print(f"✅ Created collection: {self.collection}")
         except Exception as e:
             print(f"⚠️  Failed to ensure collection: {e}")
             self.connected = False
+            return
+
+        # Also indexes collections created before the index existed; re-creating is a no-op
+        try:
+            self.client.create_payload_index(
+                collection_name=self.collection,
+                field_name="namespace",
+                field_schema=models.PayloadSchemaType.KEYWORD
+            )
+        except Exception as e:
+            print(f"⚠️  Failed to index namespace field: {e}")
 
     def insert(self, text: str, embedding: List[float], namespace: str = "default") -> str:
         """Insert a vector into the store"""
         if not self.connected:
             print("⚠️  Qdrant not connected, skipping vector insert")
-            return str(uuid.uuid4())  # Return dummy ID
+            return idgen.uuid4()  # Return dummy ID
 
         try:
-            point_id = str(uuid.uuid4())
+            point_id = idgen.uuid4()
             payload = {"text": text, "namespace": namespace}
-            point = PointStruct(id=point_id, vector=embedding, payload=payload)
+            point = PointStruct(id=point_id, vector=normalize(embedding), payload=payload)
             self.client.upsert(collection_name=self.collection, points=[point])
             return point_id
         except Exception as e:
             print(f"⚠️  Failed to insert vector: {e}")
-            return str(uuid.uuid4())  # Return dummy ID
+            return idgen.uuid4()  # Return dummy ID
+
+    def insert_many(self, texts: List[str], embeddings: List[List[float]], namespace: str = "default") -> List[str]:
+        """Insert several vectors with a single upsert"""
+        if not self.connected:
+            print("⚠️  Qdrant not connected, skipping vector insert")
+            return [idgen.uuid4() for _ in texts]  # Return dummy IDs
+
+        point_ids = [idgen.uuid4() for _ in texts]
+        try:
+            points = [
+                PointStruct(id=point_id, vector=embedding, payload={"text": text, "namespace": namespace})
+                for point_id, text, embedding in zip(point_ids, texts, normalize_rows(embeddings))
+            ]
+            self.client.upsert(collection_name=self.collection, points=points)
+        except Exception as e:
+            print(f"⚠️  Failed to insert vectors: {e}")
+        return point_ids
 
     def search(self, embedding: List[float], top_k: int = 5, namespace: str = "default") -> List[dict]:
         """Search for similar vectors"""
@@ -69,18 +163,140 @@ class VectorStore:
             return []
 
         try:
-            filt = Filter(must=[FieldCondition(key="namespace", match=MatchValue(value=namespace))])
+            filt = namespace_filter(namespace)
             hits = self.client.search(
                 collection_name=self.collection,
-                query_vector=embedding,
+                query_vector=normalize(embedding),
                 limit=top_k,
-                query_filter=filt
+                query_filter=filt,
+                search_params=SEARCH_PARAMS,
+                with_payload=["text"],
+                with_vectors=False
             )
             return [{"id": hit.id, "score": hit.score, "text": hit.payload["text"]} for hit in hits]
         except Exception as e:
             print(f"⚠️  Failed to search vectors: {e}")
             return []
 
+    async def insert_async(self, text: str, embedding: List[float], namespace: str = "default") -> str:
+        """Queue a vector for the next coalesced upsert"""
+        if not self.connected:
+            print("⚠️  Qdrant not connected, skipping vector insert")
+            return idgen.uuid4()  # Return dummy ID
+
+        point_id = idgen.uuid4()
+        self._pending.append(
+            PointStruct(id=point_id, vector=normalize(embedding), payload={"text": text, "namespace": namespace})
+        )
+        if len(self._pending) >= self.INSERT_BATCH_SIZE:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+        return point_id
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.INSERT_FLUSH_INTERVAL)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        """Send queued insert_async points as a single upsert"""
+        if not self._pending:
+            return
+        points, self._pending = self._pending, []
+        try:
+            await self.async_client.upsert(collection_name=self.collection, points=points, wait=False)
+        except Exception as e:
+            print(f"⚠️  Failed to insert vectors: {e}")
+
+    def bulk_insert(self, texts: List[str], embeddings: List[List[float]], namespace: str = "default",
+                    batch_size: int = 256, parallel: int = 8) -> List[str]:
+        """Upload many vectors in parallel batches (imports and migrations)"""
+        if not self.connected:
+            print("⚠️  Qdrant not connected, skipping vector insert")
+            return [idgen.uuid4() for _ in texts]  # Return dummy IDs
+
+        point_ids = [idgen.uuid4() for _ in texts]
+        try:
+            self.client.upload_points(
+                collection_name=self.collection,
+                points=[
+                    PointStruct(id=point_id, vector=embedding, payload={"text": text, "namespace": namespace})
+                    for point_id, text, embedding in zip(point_ids, texts, normalize_rows(embeddings))
+                ],
+                batch_size=batch_size,
+                parallel=parallel,
+            )
+        except Exception as e:
+            print(f"⚠️  Failed to upload vectors: {e}")
+        return point_ids
+
+    async def insert_many_async(self, texts: List[str], embeddings: List[List[float]],
+                                namespace: str = "default") -> List[str]:
+        """Insert several vectors with a single async upsert"""
+        if not self.connected:
+            print("⚠️  Qdrant not connected, skipping vector insert")
+            return [idgen.uuid4() for _ in texts]  # Return dummy IDs
+
+        point_ids = [idgen.uuid4() for _ in texts]
+        try:
+            points = [
+                PointStruct(id=point_id, vector=embedding, payload={"text": text, "namespace": namespace})
+                for point_id, text, embedding in zip(point_ids, texts, normalize_rows(embeddings))
+            ]
+            await self.async_client.upsert(collection_name=self.collection, points=points)
+        except Exception as e:
+            print(f"⚠️  Failed to insert vectors: {e}")
+        return point_ids
+
+    async def search_async(self, embedding: List[float], top_k: int = 5, namespace: str = "default") -> List[dict]:
+        """Search for similar vectors without blocking the event loop"""
+        if not self.connected:
+            print("⚠️  Qdrant not connected, returning empty results")
+            return []
+
+        try:
+            filt = namespace_filter(namespace)
+            hits = await self.async_client.search(
+                collection_name=self.collection,
+                query_vector=normalize(embedding),
+                limit=top_k,
+                query_filter=filt,
+                search_params=SEARCH_PARAMS,
+                with_payload=["text"],
+                with_vectors=False
+            )
+            return [{"id": hit.id, "score": hit.score, "text": hit.payload["text"]} for hit in hits]
+        except Exception as e:
+            print(f"⚠️  Failed to search vectors: {e}")
+            return []
+
+    async def search_batch_async(self, embeddings: List[List[float]], top_k: int = 5,
+                                 namespace: str = "default") -> List[List[dict]]:
+        """Search for several query vectors in a single round-trip"""
+        if not self.connected:
+            print("⚠️  Qdrant not connected, returning empty results")
+            return [[] for _ in embeddings]
+
+        try:
+            filt = namespace_filter(namespace)
+            batches = await self.async_client.search_batch(
+                collection_name=self.collection,
+                requests=[
+                    models.SearchRequest(
+                        vector=embedding, limit=top_k, filter=filt, with_payload=["text"], params=SEARCH_PARAMS
+                    )
+                    for embedding in normalize_rows(embeddings)
+                ]
+            )
+            return [
+                [{"id": hit.id, "score": hit.score, "text": hit.payload["text"]} for hit in hits]
+                for hits in batches
+            ]
+        except Exception as e:
+            print(f"⚠️  Failed to batch search vectors: {e}")
+            return [[] for _ in embeddings]
+
     def delete_namespace(self, namespace: str):
         """Delete all vectors in a namespace"""
         if not self.connected:
@@ -90,7 +306,7 @@ class VectorStore:
         try:
             self.client.delete(
                 collection_name=self.collection,
-                filter=Filter(must=[FieldCondition(key="namespace", match=MatchValue(value=namespace))])
+                filter=namespace_filter(namespace)
             )
         except Exception as e:
             print(f"⚠️  Failed to delete namespace: {e}")
@@ -98,26 +314,46 @@ class VectorStore:
 QDRANT_URL = os.getenv("QDRANT_URL", "http://qdrant:6333")
 COLLECTION_NAME = "memory_vectors"
 
-client = QdrantClient(url=QDRANT_URL)
+# One pooled client per process; the collection is ensured once at startup, not per call
+async_client = AsyncQdrantClient(
+    url=QDRANT_URL,
+    prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "true").lower() == "true",
+    grpc_port=int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+    pool_size=100,
+    timeout=60,
+    check_compatibility=False,
+)
 
-def init_vector_store():
-    if not client.collection_exists(COLLECTION_NAME):
-        client.recreate_collection(
+async def init_vector_store():
+    collections = await async_client.get_collections()
+    if COLLECTION_NAME not in [c.name for c in collections.collections]:
+        await async_client.recreate_collection(
+            collection_name=COLLECTION_NAME,
+            vectors_config=collection_vectors_config(384),
+            quantization_config=QUANTIZATION_CONFIG,
+            optimizers_config=models.OptimizersConfigDiff(memmap_threshold=MEMMAP_THRESHOLD),
+        )
+    try:
+        await async_client.create_payload_index(
             collection_name=COLLECTION_NAME,
-            vectors_config=models.VectorParams(size=384, distance=models.Distance.COSINE),
+            field_name="namespace",
+            field_schema=models.PayloadSchemaType.KEYWORD
         )
+    except Exception as e:
+        print(f"⚠️  Failed to index namespace field: {e}")
 
-def add_vector(id_: int, vector: List[float]):
-    init_vector_store()
-    client.upsert(
+async def add_vector(id_: int, vector: List[float]):
+    await async_client.upsert(
         collection_name=COLLECTION_NAME,
-        points=[models.PointStruct(id=id_, vector=vector, payload={})]
+        points=[models.PointStruct(id=id_, vector=normalize(vector), payload={})]
     )
 
-def search_vectors(vector: List[float], limit=5):
-    init_vector_store()
-    return client.search(
+async def search_vectors(vector: List[float], limit=5):
+    return await async_client.search(
         collection_name=COLLECTION_NAME,
-        query_vector=vector,
-        limit=limit
+        query_vector=normalize(vector),
+        limit=limit,
+        search_params=SEARCH_PARAMS,
+        with_payload=False,
+        with_vectors=False
     )
@@ -3,20 +3,75 @@ OpenAI API Compatibility Layer for AlsaniaMCP
 Provides OpenAI-compatible endpoints that integrate with AlsaniaMCP's memory system
 """
 
+import asyncio
+import hashlib
 import json
 import logging
+import os
+import re
 import time
-import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+import orjson
 from fastapi import HTTPException
 from pydantic import BaseModel, Field
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
 
-from core.embeddings import embedding_manager
+try:
+    import tiktoken
+except ImportError:  # fall back to the length heuristic
+    tiktoken = None
+
+from core.embeddings import cached_embedding, embedding_manager
 from core.auth import auth_manager
+from shared.utils import QueueBatcher, collect_batch, idgen
 
 logger = logging.getLogger("alsaniamcp.openai_compat")
 
+# Near-duplicate questions within a namespace and conversation reuse an earlier answer.
+# Every turn is written back to memory, so answers are only reused briefly before the
+# memory context they were built on goes stale.
+SEMANTIC_CACHE_COLLECTION = "chat_cache"
+SEMANTIC_CACHE_THRESHOLD = 0.95
+SEMANTIC_CACHE_TTL = 10 * 60
+SEMANTIC_CACHE_PRUNE_INTERVAL = SEMANTIC_CACHE_TTL
+SEMANTIC_CACHE_RETRY_AFTER = 60
+
+# Concurrent memory searches arriving within this window share one search_batch call
+SEARCH_BATCH_WINDOW = 0.005
+SEARCH_BATCH_MAX = 64
+
+TOKENIZER_ENCODING = "cl100k_base"
+TOKENIZER_THREADS = min(8, os.cpu_count() or 1)
+# Batches with more characters than this are encoded in a worker thread
+TOKENIZER_INLINE_CHARS = 4096
+
+# Intent dispatch for _generate_response: trigger words -> intent, checked in priority order
+INTENT_TRIGGERS = {"hello": "greet", "hi": "greet", "remember": "recall", "recall": "recall"}
+INTENT_PRIORITY = ("greet", "recall")
+_WORD_RE = re.compile(r"\w+")
+
+# intent -> (template without memories, template with memories); {snippet} is the top memory text
+RESPONSE_TEMPLATES = {
+    "greet": ("Hello! I'm AlsaniaMCP, an AI assistant with persistent memory. How can I help you today?",) * 2,
+    "recall": (
+        "I don't have any specific memories related to your query, but I'm ready to learn and remember new information.",
+        "I found {count} relevant memories. Here's what I remember: {snippet}...",
+    ),
+    "question": (
+        "I don't have specific information about that in my memory, but I'd be happy to help you explore the topic further.",
+        "Based on my memories, here's what I can tell you: {snippet}...",
+    ),
+    "ack": ("I understand. I've noted this information and will remember it for future conversations. Is there anything specific you'd like me to help you with?",) * 2,
+}
+SNIPPET_LENGTHS = {"recall": 200, "question": 300}
+
+GENERATION_ERROR_RESPONSE = "I apologize, but I encountered an error while processing your request. Please try again."
+
+# Streamed replies are sent one word (with its leading whitespace) per SSE chunk
+_STREAM_PIECE_RE = re.compile(r"\s*\S+|\s+$")
+
 # OpenAI-compatible request/response models
 class ChatMessage(BaseModel):
     role: str = Field(..., description="Message role: system, user, or assistant")
@@ -41,6 +96,8 @@ class EmbeddingRequest(BaseModel):
     input: List[str] = Field(..., description="Input texts to embed")
     user: Optional[str] = Field(default=None, description="User identifier")
 
+# Response shapes as documented by OpenAI; chat_completion/create_embeddings build
+# the equivalent plain dicts directly so the hot path skips model validation
 class Usage(BaseModel):
     prompt_tokens: int
     completion_tokens: int = 0
@@ -70,6 +127,143 @@ class EmbeddingResponse(BaseModel):
     model: str
     usage: Usage
 
+class SemanticCache:
+    """Chat responses keyed by query embedding, matched on cosine similarity"""
+    
+    def __init__(self, url: str = None, collection: str = SEMANTIC_CACHE_COLLECTION, dim: int = 384,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl: int = SEMANTIC_CACHE_TTL):
+        self.url = url or os.getenv("QDRANT_URL", "http://localhost:6333")
+        self.collection = collection
+        self.dim = dim
+        self.threshold = threshold
+        self.ttl = ttl
+        self.client: Optional[AsyncQdrantClient] = None
+        self._ready = False
+        self._unavailable_until = 0.0
+        self._last_prune = 0.0
+    
+    async def _get_client(self) -> Optional[AsyncQdrantClient]:
+        """Client with the cache collection in place, or None while Qdrant is unreachable"""
+        if self._ready:
+            return self.client
+        if time.monotonic() < self._unavailable_until:
+            return None
+        try:
+            if self.client is None:
+                self.client = AsyncQdrantClient(url=self.url, check_compatibility=False)
+            collections = await self.client.get_collections()
+            if self.collection not in [c.name for c in collections.collections]:
+                await self.client.create_collection(
+                    collection_name=self.collection,
+                    vectors_config=models.VectorParams(size=self.dim, distance=models.Distance.COSINE)
+                )
+                for field, schema in (("namespace", models.PayloadSchemaType.KEYWORD),
+                                      ("context", models.PayloadSchemaType.KEYWORD),
+                                      ("created_at", models.PayloadSchemaType.FLOAT)):
+                    await self.client.create_payload_index(self.collection, field_name=field, field_schema=schema)
+            self._ready = True
+            return self.client
+        except Exception as e:
+            logger.warning(f"Semantic cache unavailable: {e}")
+            self._unavailable_until = time.monotonic() + SEMANTIC_CACHE_RETRY_AFTER
+            return None
+    
+    @staticmethod
+    def context_key(messages: List["ChatMessage"]) -> str:
+        """Digest of the turns before the last message, so answers are only reused within the same conversation"""
+        digest = hashlib.blake2b(digest_size=16)
+        for msg in messages[:-1]:
+            digest.update(orjson.dumps((msg.role, msg.content)))
+        return digest.hexdigest()
+    
+    async def lookup(self, embedding: List[float], namespace: str, context: str) -> Optional[str]:
+        """Return a cached response for a near-identical query in the same conversation, if any"""
+        client = await self._get_client()
+        if client is None:
+            return None
+        try:
+            hits = await client.search(
+                collection_name=self.collection,
+                query_vector=embedding,
+                limit=1,
+                score_threshold=self.threshold,
+                query_filter=models.Filter(must=[
+                    models.FieldCondition(key="namespace", match=models.MatchValue(value=namespace)),
+                    models.FieldCondition(key="context", match=models.MatchValue(value=context)),
+                    models.FieldCondition(key="created_at", range=models.Range(gte=time.time() - self.ttl))
+                ])
+            )
+            return hits[0].payload["response_content"] if hits else None
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+    
+    async def store(self, embedding: List[float], namespace: str, context: str, response_content: str):
+        """Cache a generated response and prune expired entries about once an hour"""
+        client = await self._get_client()
+        if client is None:
+            return
+        try:
+            now = time.time()
+            await client.upsert(
+                collection_name=self.collection,
+                points=[models.PointStruct(
+                    id=idgen.uuid4(),
+                    vector=embedding,
+                    payload={"namespace": namespace, "context": context,
+                             "response_content": response_content, "created_at": now}
+                )],
+                wait=False
+            )
+            if now - self._last_prune >= SEMANTIC_CACHE_PRUNE_INTERVAL:
+                self._last_prune = now
+                await client.delete(
+                    collection_name=self.collection,
+                    points_selector=models.FilterSelector(filter=models.Filter(must=[
+                        models.FieldCondition(key="created_at", range=models.Range(lt=now - self.ttl))
+                    ])),
+                    wait=False
+                )
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
+
+class SearchBatcher(QueueBatcher):
+    """Coalesce concurrent memory searches into one Qdrant search_batch per namespace"""
+    
+    def __init__(self, get_vector_store, window: float = SEARCH_BATCH_WINDOW, max_batch: int = SEARCH_BATCH_MAX):
+        super().__init__(max_batch, window)
+        self.get_vector_store = get_vector_store
+    
+    async def submit(self, embedding: List[float], namespace: str, top_k: int) -> List[Dict]:
+        """Queue a search and wait for its hits"""
+        return await self._submit(embedding, namespace, top_k)
+    
+    async def run(self):
+        """Gather up to max_batch searches per window and dispatch one batched search per (namespace, top_k)"""
+        while True:
+            batch = await collect_batch(self.queue, self.max_batch, self.max_wait)
+            
+            groups: Dict[tuple, list] = {}
+            for item in batch:
+                groups.setdefault((item[1], item[2]), []).append(item)
+            await asyncio.gather(*(self._dispatch(key, items) for key, items in groups.items()))
+    
+    async def _dispatch(self, key: tuple, items: list):
+        namespace, top_k = key
+        try:
+            vector_store = await self.get_vector_store()
+            results = await vector_store.search_batch_async(
+                [embedding for embedding, *_ in items], top_k=top_k, namespace=namespace
+            )
+        except Exception as e:
+            for *_, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (*_, future), hits in zip(items, results):
+            if not future.done():
+                future.set_result(hits)
+
 class OpenAICompatibilityLayer:
     """OpenAI API compatibility layer"""
     
@@ -81,33 +275,113 @@ class OpenAICompatibilityLayer:
             "gpt-4": "AlsaniaMCP Memory-Enhanced Chat Model (GPT-4 Compatible)",
             "text-embedding-ada-002": "AlsaniaMCP Local Embedding Model (Ada-002 Compatible)"
         }
+        # The model list never changes at runtime, so /v1/models serves one prebuilt dict
+        created = int(time.time())
+        self._models_list_cache = {
+            "object": "list",
+            "data": [
+                {
+                    "id": model_id,
+                    "object": "model",
+                    "created": created,
+                    "owned_by": "alsania",
+                    "permission": [],
+                    "root": model_id,
+                    "parent": None,
+                    "description": description
+                }
+                for model_id, description in self.supported_models.items()
+            ]
+        }
+        self.semantic_cache = SemanticCache()
+        self._vector_store = None
+        self._vector_store_lock = asyncio.Lock()
+        self._tok = None  # tiktoken encoding, loaded by preload_tokenizer; False if unavailable
+        self.search_batcher = SearchBatcher(self._get_vector_store)
+        # References to in-flight persistence tasks so they aren't garbage collected
+        self._background_tasks = set()
+    
+    def _get_tokenizer(self):
+        """cl100k_base encoding, or None when tiktoken or its BPE file isn't available"""
+        if self._tok is None:
+            self._tok = False
+            if tiktoken is not None:
+                try:
+                    self._tok = tiktoken.get_encoding(TOKENIZER_ENCODING)
+                except Exception as e:
+                    logger.warning(f"tiktoken unavailable, estimating token counts: {e}")
+        return self._tok or None
     
-    def _count_tokens(self, text: str) -> int:
-        """Simple token counting (approximation)"""
-        # Rough approximation: 1 token ≈ 4 characters
-        return max(1, len(text) // 4)
+    def preload_tokenizer(self):
+        """Load the encoding (which may download its BPE file); call off the event loop"""
+        self._get_tokenizer()
     
-    def _search_memory_context(self, query: str, agent_namespace: str = None, limit: int = 5) -> List[Dict]:
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Token counts for several texts, encoded in one threaded tiktoken batch"""
+        tok = self._get_tokenizer()
+        if tok is None:
+            return [max(1, len(text) >> 2) for text in texts]
+        return [len(ids) for ids in tok.encode_batch(texts, num_threads=TOKENIZER_THREADS, disallowed_special=())]
+    
+    async def _count_tokens_batch_async(self, texts: List[str]) -> List[int]:
+        """_count_tokens_batch, run in a thread unless the encoding is loaded and the batch is small"""
+        if self._tok is None or sum(map(len, texts)) > TOKENIZER_INLINE_CHARS:
+            return await asyncio.to_thread(self._count_tokens_batch, texts)
+        return self._count_tokens_batch(texts)
+    
+    async def _get_vector_store(self):
+        """Shared VectorStore, so its Qdrant clients are created once rather than per search"""
+        if self._vector_store is None:
+            async with self._vector_store_lock:
+                if self._vector_store is None:
+                    from memory.vector_store import VectorStore
+                    # VectorStore() connects synchronously; keep that off the event loop
+                    self._vector_store = await asyncio.to_thread(VectorStore)
+        return self._vector_store
+    
+    async def _search_memory_context(self, query: str, agent_namespace: str = None, limit: int = 5,
+                                     embedding: List[float] = None) -> List[Dict]:
         """Search memory for relevant context"""
         try:
-            from memory.vector_store import VectorStore
+            # Get embedding for query (repeated queries hit the in-process LRU)
+            if embedding is None:
+                embedding = await asyncio.to_thread(cached_embedding, query)
             
-            # Get embedding for query
-            embedding = embedding_manager.get_embedding(query)
-            
-            # Search vector store
-            vector_store = VectorStore()
+            # Search vector store, batched with any concurrent chat searches
             namespace = agent_namespace or "default"
-            results = vector_store.search(embedding, top_k=limit, namespace=namespace)
+            results = await self.search_batcher.submit(embedding, namespace, limit)
             
             return results
         except Exception as e:
             logger.warning(f"Memory search failed: {e}")
             return []
     
-    def _generate_response(self, messages: List[ChatMessage], memory_context: List[Dict], 
-                          max_tokens: int = 1000, temperature: float = 0.7) -> str:
-        """Generate response using memory context"""
+    async def _persist_conversation(self, last_message: str, response: str):
+        """Store a user message and its reply as memories"""
+        try:
+            from core.main import save_memory_entry, vector_store
+            from lib.secure_memory_id import secure_memory_id
+            
+            texts = [last_message, response]
+            sources = ["openai_compat_user", "openai_compat_assistant"]
+            embeddings = await asyncio.to_thread(embedding_manager.get_embeddings_batch, texts)
+            await asyncio.gather(
+                *(asyncio.to_thread(save_memory_entry, secure_memory_id(), text, source)
+                  for text, source in zip(texts, sources)),
+                vector_store.insert_many_async(texts, embeddings)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store conversation in memory: {e}")
+    
+    def _spawn(self, coro):
+        """Run coro in the background, holding a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _generate_response(self, messages: List[ChatMessage], memory_context: List[Dict], 
+                                 max_tokens: int = 1000, temperature: float = 0.7, persist: bool = True) -> str:
+        """Generate response using memory context (persist=False leaves storing the exchange to the caller)"""
         try:
             # Build context from memory
             context_parts = []
@@ -128,136 +402,187 @@ class OpenAICompatibilityLayer:
             # Generate simple response based on context
             last_message = messages[-1].content.lower() if messages else ""
             
-            # Simple response generation based on patterns
-            if "hello" in last_message or "hi" in last_message:
-                response = "Hello! I'm AlsaniaMCP, an AI assistant with persistent memory. How can I help you today?"
-            elif "remember" in last_message or "recall" in last_message:
-                if memory_context:
-                    response = f"I found {len(memory_context)} relevant memories. Here's what I remember: {memory_context[0].get('text', '')[:200]}..."
-                else:
-                    response = "I don't have any specific memories related to your query, but I'm ready to learn and remember new information."
-            elif "?" in last_message:
-                if memory_context:
-                    response = f"Based on my memories, here's what I can tell you: {memory_context[0].get('text', '')[:300]}..."
-                else:
-                    response = "I don't have specific information about that in my memory, but I'd be happy to help you explore the topic further."
+            # Simple response generation: one tokenization pass, then a template lookup by intent
+            intents = {INTENT_TRIGGERS[word] for word in _WORD_RE.findall(last_message) if word in INTENT_TRIGGERS}
+            intent = next((i for i in INTENT_PRIORITY if i in intents), "question" if "?" in last_message else "ack")
+            template = RESPONSE_TEMPLATES[intent][bool(memory_context)]
+            if memory_context:
+                snippet = memory_context[0].get('text', '')[:SNIPPET_LENGTHS.get(intent, 0)]
+                response = template.format(count=len(memory_context), snippet=snippet)
             else:
-                response = "I understand. I've noted this information and will remember it for future conversations. Is there anything specific you'd like me to help you with?"
+                response = template
             
-            # Store the conversation in memory
-            try:
-                from core.main import save_memory_entry, insert_vector
-                from lib.secure_memory_id import secure_memory_id
-                
-                # Store user message
-                user_mem_id = secure_memory_id()
-                save_memory_entry(user_mem_id, last_message, "openai_compat_user")
-                user_embedding = embedding_manager.get_embedding(last_message)
-                insert_vector(user_embedding, {"memory_id": user_mem_id, "text": last_message, "source": "openai_compat_user"})
-                
-                # Store assistant response
-                assistant_mem_id = secure_memory_id()
-                save_memory_entry(assistant_mem_id, response, "openai_compat_assistant")
-                assistant_embedding = embedding_manager.get_embedding(response)
-                insert_vector(assistant_embedding, {"memory_id": assistant_mem_id, "text": response, "source": "openai_compat_assistant"})
-                
-            except Exception as e:
-                logger.warning(f"Failed to store conversation in memory: {e}")
+            # Store the conversation in memory without holding up the reply
+            if persist:
+                self._spawn(self._persist_conversation(last_message, response))
             
             return response
             
         except Exception as e:
             logger.error(f"Response generation failed: {e}")
-            return "I apologize, but I encountered an error while processing your request. Please try again."
+            return GENERATION_ERROR_RESPONSE
     
-    async def chat_completion(self, request: ChatCompletionRequest, api_key_info: Dict) -> ChatCompletionResponse:
-        """Handle chat completion request"""
-        try:
-            # Validate model
-            if request.model not in self.supported_models:
-                raise HTTPException(status_code=400, detail=f"Model {request.model} not supported")
-            
-            # Get the last user message for memory search
-            user_messages = [msg for msg in request.messages if msg.role == "user"]
-            last_user_message = user_messages[-1].content if user_messages else ""
-            
-            # Determine agent namespace from API key
-            agent_namespace = None
-            if api_key_info.get('namespaces'):
-                agent_namespace = api_key_info['namespaces'][0]
-            
+    async def _respond(self, request: ChatCompletionRequest, api_key_info: Dict,
+                       defer_storage: bool = False) -> Tuple[str, List[Any]]:
+        """Answer the last user message; with defer_storage the cache/memory writes are
+        returned as coroutines for the caller to schedule instead of being run here"""
+        deferred = []
+        
+        # Get the last user message for memory search
+        user_messages = [msg for msg in request.messages if msg.role == "user"]
+        last_user_message = user_messages[-1].content if user_messages else ""
+        
+        # Determine agent namespace from API key
+        agent_namespace = None
+        if api_key_info.get('namespaces'):
+            agent_namespace = api_key_info['namespaces'][0]
+        
+        # Reuse the answer to a near-identical earlier question when there is one
+        namespace = agent_namespace or "default"
+        context = SemanticCache.context_key(request.messages)
+        query_embedding = None
+        response_content = None
+        if last_user_message.strip():
+            query_embedding = await asyncio.to_thread(cached_embedding, last_user_message)
+            response_content = await self.semantic_cache.lookup(query_embedding, namespace, context)
+        
+        if response_content is not None:
+            # A replayed answer is still a turn of the conversation, so it is stored like a generated one
+            persist = self._persist_conversation(request.messages[-1].content.lower(), response_content)
+            if defer_storage:
+                deferred.append(persist)
+            else:
+                self._spawn(persist)
+        else:
             # Search memory for context
-            memory_context = self._search_memory_context(last_user_message, agent_namespace)
+            memory_context = await self._search_memory_context(
+                last_user_message, agent_namespace, embedding=query_embedding
+            )
             
             # Generate response
-            response_content = self._generate_response(
+            response_content = await self._generate_response(
                 request.messages, 
                 memory_context, 
                 request.max_tokens, 
-                request.temperature
+                request.temperature,
+                persist=not defer_storage
             )
+            if response_content != GENERATION_ERROR_RESPONSE:
+                if defer_storage and request.messages:
+                    deferred.append(self._persist_conversation(request.messages[-1].content.lower(), response_content))
+                if query_embedding is not None:
+                    store = self.semantic_cache.store(query_embedding, namespace, context, response_content)
+                    if defer_storage:
+                        deferred.append(store)
+                    else:
+                        await store
+        
+        return response_content, deferred
+    
+    async def chat_completion(self, request: ChatCompletionRequest, api_key_info: Dict) -> Dict[str, Any]:
+        """Handle chat completion request"""
+        try:
+            # Validate model
+            if request.model not in self.supported_models:
+                raise HTTPException(status_code=400, detail=f"Model {request.model} not supported")
+            
+            response_content, _ = await self._respond(request, api_key_info)
             
             # Calculate token usage
-            prompt_tokens = sum(self._count_tokens(msg.content) for msg in request.messages)
-            completion_tokens = self._count_tokens(response_content)
+            counts = await self._count_tokens_batch_async([msg.content for msg in request.messages] + [response_content])
+            prompt_tokens = sum(counts[:-1])
+            completion_tokens = counts[-1]
             
-            # Create response
-            response = ChatCompletionResponse(
-                id=f"chatcmpl-{uuid.uuid4().hex[:29]}",
-                created=int(time.time()),
-                model=request.model,
-                choices=[
-                    ChatChoice(
-                        index=0,
-                        message=ChatMessage(role="assistant", content=response_content),
-                        finish_reason="stop"
-                    )
+            # Create response (ChatCompletionResponse shape)
+            return {
+                "id": f"chatcmpl-{idgen.next_hex(15)[:29]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": response_content, "name": None},
+                        "finish_reason": "stop"
+                    }
                 ],
-                usage=Usage(
-                    prompt_tokens=prompt_tokens,
-                    completion_tokens=completion_tokens,
-                    total_tokens=prompt_tokens + completion_tokens
-                )
-            )
-            
-            return response
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            }
             
         except Exception as e:
             logger.error(f"Chat completion failed: {e}")
             raise HTTPException(status_code=500, detail=str(e))
     
-    async def create_embeddings(self, request: EmbeddingRequest, api_key_info: Dict) -> EmbeddingResponse:
+    def chat_completion_stream(self, request: ChatCompletionRequest, api_key_info: Dict) -> AsyncIterator[bytes]:
+        """Handle a stream=True chat completion request as SSE chat.completion.chunk events"""
+        # Validate before the response starts, while an error status can still be sent
+        if request.model not in self.supported_models:
+            raise HTTPException(status_code=400, detail=f"Model {request.model} not supported")
+        return self._stream_chunks(request, api_key_info)
+    
+    async def _stream_chunks(self, request: ChatCompletionRequest, api_key_info: Dict) -> AsyncIterator[bytes]:
+        completion_id = f"chatcmpl-{idgen.next_hex(15)[:29]}"
+        created = int(time.time())
+        
+        def event(delta: Dict[str, str], finish_reason: Optional[str] = None) -> bytes:
+            return b"data: " + orjson.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": request.model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }) + b"\n\n"
+        
+        deferred = []
+        try:
+            # The role chunk goes out before any memory search or generation
+            yield event({"role": "assistant", "content": ""})
+            
+            try:
+                response_content, deferred = await self._respond(request, api_key_info, defer_storage=True)
+            except Exception as e:
+                logger.error(f"Chat completion stream failed: {e}")
+                response_content = GENERATION_ERROR_RESPONSE
+            
+            for piece in _STREAM_PIECE_RE.findall(response_content):
+                yield event({"content": piece})
+            yield event({}, "stop")
+            yield b"data: [DONE]\n\n"
+        finally:
+            # Store the exchange after the last chunk (or once the client has gone away)
+            for coro in deferred:
+                self._spawn(coro)
+    
+    async def create_embeddings(self, request: EmbeddingRequest, api_key_info: Dict) -> Dict[str, Any]:
         """Handle embedding creation request"""
         try:
             # Validate model
             if request.model not in self.supported_models:
                 raise HTTPException(status_code=400, detail=f"Model {request.model} not supported")
             
-            # Generate embeddings
-            embeddings_data = []
-            total_tokens = 0
-            
-            for i, text in enumerate(request.input):
-                embedding = embedding_manager.get_embedding(text, use_external=False)
-                embeddings_data.append(
-                    EmbeddingData(
-                        index=i,
-                        embedding=embedding
-                    )
-                )
-                total_tokens += self._count_tokens(text)
+            # Generate all embeddings in one batch, off the event loop
+            embeddings = await asyncio.to_thread(embedding_manager.get_embeddings_batch, request.input)
+            embeddings_data = [
+                {"object": "embedding", "index": i, "embedding": embedding}
+                for i, embedding in enumerate(embeddings)
+            ]
+            total_tokens = sum(await self._count_tokens_batch_async(request.input))
             
-            # Create response
-            response = EmbeddingResponse(
-                data=embeddings_data,
-                model=request.model,
-                usage=Usage(
-                    prompt_tokens=total_tokens,
-                    total_tokens=total_tokens
-                )
-            )
-            
-            return response
+            # Create response (EmbeddingResponse shape)
+            return {
+                "object": "list",
+                "data": embeddings_data,
+                "model": request.model,
+                "usage": {
+                    "prompt_tokens": total_tokens,
+                    "completion_tokens": 0,
+                    "total_tokens": total_tokens
+                }
+            }
             
         except Exception as e:
             logger.error(f"Embedding creation failed: {e}")
@@ -265,23 +590,7 @@ class OpenAICompatibilityLayer:
     
     def list_models(self) -> Dict[str, Any]:
         """List available models"""
-        models = []
-        for model_id, description in self.supported_models.items():
-            models.append({
-                "id": model_id,
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "alsania",
-                "permission": [],
-                "root": model_id,
-                "parent": None,
-                "description": description
-            })
-        
-        return {
-            "object": "list",
-            "data": models
-        }
+        return self._models_list_cache
 
 # Global compatibility layer instance
 openai_compat = OpenAICompatibilityLayer()
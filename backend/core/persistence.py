@@ -4,22 +4,111 @@ Ensures data integrity and persistence across database restarts
 """
 
 import asyncio
+import gzip
 import hashlib
-import json
 import logging
-import psycopg2
-import psycopg2.extras
+import os
+import sqlite3
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 from pathlib import Path
 
-from qdrant_client import QdrantClient
+import asyncpg
+import httpx
+import orjson
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue
 
 from config.config import config
 
 logger = logging.getLogger("alsaniamcp.persistence")
 
+# Tables covered by integrity checks and backups
+TRACKED_TABLES = ['memory.memories', 'forensics.access_logs', 'agents.agent_states', 'memory.snapshots']
+
+SCHEMA_TABLES_SQL = """
+    SELECT COUNT(DISTINCT table_name)
+    FROM information_schema.columns
+    WHERE table_schema IN ('memory', 'forensics', 'agents')
+"""
+ORPHANED_LOGS_SQL = """
+    SELECT COUNT(*)
+    FROM forensics.access_logs al
+    LEFT JOIN memory.memories m ON al.memory_id = m.id
+    WHERE m.id IS NULL AND al.memory_id IS NOT NULL
+"""
+# Health checks poll verify_data_integrity; results are reused for this many seconds
+INTEGRITY_CACHE_TTL = 10.0
+
+# Qdrant collection names are listed at most once per this many seconds
+COLLECTIONS_CACHE_TTL = 5.0
+
+BACKUP_ROOT = Path("backups")
+# Per-table fingerprints of the last backup, so unchanged tables are hard-linked instead of re-dumped
+BACKUP_STATE_DB = BACKUP_ROOT / ".state.db"
+# Row count plus an order-independent sum of row hashes: changes on any insert, update or delete
+TABLE_FINGERPRINT_SQL = "SELECT COUNT(*)::text || ':' || COALESCE(SUM(hashtextextended(t::text, 0)::numeric), 0)::text FROM {table} t"
+
+# Backup files are gzipped; level 3 keeps compression cheap relative to the I/O it saves
+BACKUP_COMPRESSLEVEL = 3
+
+# Points fetched per scroll request when dumping a Qdrant collection
+QDRANT_BACKUP_PAGE_SIZE = 1024
+# Collections backed up at once, so a backup can't crowd out live search traffic
+QDRANT_BACKUP_CONCURRENCY = 4
+
+# Planner row estimate (O(1) catalog read); -1 until the table is first analyzed
+MEMORIES_ESTIMATE_SQL = "SELECT reltuples::bigint FROM pg_class WHERE oid = 'memory.memories'::regclass"
+
+# Which tables exist and have a created_at column (for when the combined probe fails)
+TABLE_COLUMNS_SQL = """
+    SELECT table_schema || '.' || table_name AS name, bool_or(column_name = 'created_at') AS has_created_at
+    FROM information_schema.columns
+    WHERE table_schema IN ('memory', 'forensics', 'agents')
+    GROUP BY table_schema, table_name
+"""
+
+def _integrity_sql(tables: List[str]) -> str:
+    """Every integrity probe as one statement (one round trip): rows of (probe, count, latest)"""
+    return "\nUNION ALL\n".join(
+        [f"SELECT 'schema_tables' AS probe, ({SCHEMA_TABLES_SQL}) AS count, NULL::timestamptz AS latest",
+         f"SELECT 'orphaned_logs', ({ORPHANED_LOGS_SQL}), NULL::timestamptz"]
+        + [f"SELECT '{table}', COUNT(*), MAX(created_at)::timestamptz FROM {table}" for table in tables]
+    )
+
+INTEGRITY_SQL = _integrity_sql(TRACKED_TABLES)
+
+def _load_backup_state() -> Dict[str, Tuple[str, str, int]]:
+    """name -> (fingerprint, file, records) of the most recent backup of each table"""
+    if not BACKUP_STATE_DB.exists():
+        return {}
+    with sqlite3.connect(BACKUP_STATE_DB) as db:
+        rows = db.execute("SELECT name, fingerprint, file, records FROM fingerprints").fetchall()
+    return {name: (fingerprint, file, records) for name, fingerprint, file, records in rows}
+
+def _save_backup_state(entries: Dict[str, Tuple[str, str, int]]):
+    BACKUP_ROOT.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(BACKUP_STATE_DB) as db:
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints
+            (name TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, file TEXT NOT NULL, records INTEGER NOT NULL)
+        """)
+        db.executemany(
+            "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?)",
+            [(name, *entry) for name, entry in entries.items()]
+        )
+
+def _link_previous(previous: str, path: Path) -> bool:
+    """Hard-link an earlier backup file into place; False if it is gone or can't be linked"""
+    try:
+        os.link(previous, path)
+        return True
+    except OSError:
+        return False
+
 class PersistenceManager:
     """Manages data persistence and integrity across Qdrant and PostgreSQL"""
     
@@ -27,41 +116,103 @@ class PersistenceManager:
         self.postgres_url = config.POSTGRES_URL
         self.qdrant_client = None
         self.last_integrity_check = None
+        self._pool: Optional[asyncpg.Pool] = None
+        self._pool_lock = asyncio.Lock()
+        self._integrity_cache: Optional[Tuple[float, Dict[str, any]]] = None  # (monotonic time, results)
+        self._integrity_lock = asyncio.Lock()
+        self._qdrant_lock = asyncio.Lock()
+        self._collections_cache: Optional[Tuple[float, List[str]]] = None  # (monotonic time, names)
+        self._backup_sem = asyncio.Semaphore(QDRANT_BACKUP_CONCURRENCY)
+        self._qdrant_rest_url = None  # snapshot downloads are REST-only, even when the client uses gRPC
         
-    def get_postgres_connection(self):
-        """Get PostgreSQL connection with proper error handling"""
-        try:
-            return psycopg2.connect(
-                self.postgres_url,
-                cursor_factory=psycopg2.extras.RealDictCursor
-            )
-        except Exception as e:
-            logger.error(f"Failed to connect to PostgreSQL: {e}")
-            raise
+    async def _get_pool(self) -> asyncpg.Pool:
+        """Lazily create the asyncpg pool (inside the running event loop)"""
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    try:
+                        self._pool = await asyncpg.create_pool(
+                            self.postgres_url, min_size=1, max_size=10, statement_cache_size=1024
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to connect to PostgreSQL: {e}")
+                        raise
+        return self._pool
     
-    def get_qdrant_client(self):
-        """Get Qdrant client with proper error handling"""
+    @asynccontextmanager
+    async def _acquire(self):
+        """Borrow a PostgreSQL connection from the pool"""
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            yield conn
+    
+    async def close(self):
+        """Close the PostgreSQL pool and the Qdrant client"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        if self.qdrant_client is not None:
+            await self.qdrant_client.close()
+            self.qdrant_client = None
+    
+    async def get_qdrant_client(self) -> AsyncQdrantClient:
+        """Get the shared async Qdrant client with proper error handling"""
         if not self.qdrant_client:
-            try:
-                qdrant_url = config.QDRANT_URL
-                if qdrant_url.startswith('http://'):
-                    host = qdrant_url.replace('http://', '').split(':')[0]
-                    port = int(qdrant_url.split(':')[-1]) if ':' in qdrant_url.split('//')[1] else 6333
-                else:
-                    host = 'localhost'
-                    port = 6333
-                
-                self.qdrant_client = QdrantClient(host=host, port=port, check_compatibility=False)
-                # Test connection
-                self.qdrant_client.get_collections()
-                logger.info(f"✅ Connected to Qdrant at {host}:{port}")
-            except Exception as e:
-                logger.error(f"Failed to connect to Qdrant: {e}")
-                raise
+            async with self._qdrant_lock:
+                if not self.qdrant_client:
+                    try:
+                        qdrant_url = config.QDRANT_URL
+                        url = urlparse(qdrant_url if "://" in qdrant_url else f"http://{qdrant_url}")
+                        host, port = url.hostname or 'localhost', url.port or 6333
+                        prefix = url.path.strip('/')
+                        
+                        client = AsyncQdrantClient(
+                            host=host, port=port, https=url.scheme == 'https',
+                            prefix=prefix or None, check_compatibility=False,
+                            prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "true").lower() == "true",
+                            grpc_port=int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+                        )
+                        # Test connection (and seed the collection list)
+                        self._cache_collections(await client.get_collections())
+                        self.qdrant_client = client
+                        netloc = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+                        self._qdrant_rest_url = f"{'https' if url.scheme == 'https' else 'http'}://{netloc}" + (f"/{prefix}" if prefix else "")
+                        logger.info(f"✅ Connected to Qdrant at {host}:{port}")
+                    except Exception as e:
+                        logger.error(f"Failed to connect to Qdrant: {e}")
+                        raise
         return self.qdrant_client
     
+    def _cache_collections(self, collections) -> List[str]:
+        names = [collection.name for collection in collections.collections]
+        self._collections_cache = (time.monotonic(), names)
+        return names
+    
+    async def _collection_names(self) -> List[str]:
+        """Qdrant collection names, shared across the verify and backup stages for a few seconds"""
+        cached = self._collections_cache
+        if cached and time.monotonic() - cached[0] < COLLECTIONS_CACHE_TTL:
+            return cached[1]
+        client = await self.get_qdrant_client()
+        return self._cache_collections(await client.get_collections())
+    
     async def verify_data_integrity(self) -> Dict[str, any]:
-        """Comprehensive data integrity verification"""
+        """Comprehensive data integrity verification (cached for INTEGRITY_CACHE_TTL seconds)"""
+        cached = self._integrity_cache
+        if cached and time.monotonic() - cached[0] < INTEGRITY_CACHE_TTL:
+            return cached[1]
+        
+        # Single-flight: concurrent callers wait for one check instead of each running their own
+        async with self._integrity_lock:
+            cached = self._integrity_cache
+            if cached and time.monotonic() - cached[0] < INTEGRITY_CACHE_TTL:
+                return cached[1]
+            results = await self._run_integrity_check()
+            self._integrity_cache = (time.monotonic(), results)
+            return results
+    
+    async def _run_integrity_check(self) -> Dict[str, any]:
+        """Run the PostgreSQL, Qdrant and cross-database checks"""
         results = {
             "timestamp": datetime.now().isoformat(),
             "postgres": {"status": "unknown", "details": {}},
@@ -71,16 +222,26 @@ class PersistenceManager:
         }
         
         try:
-            # Verify PostgreSQL integrity
-            postgres_results = await self._verify_postgres_integrity()
+            # Verify PostgreSQL and Qdrant integrity concurrently (independent services)
+            checks = await asyncio.gather(
+                self._verify_postgres_integrity(),
+                self._verify_qdrant_integrity(),
+                return_exceptions=True
+            )
+            postgres_results, qdrant_results = [
+                {"status": "critical", "details": {"error": str(check)}} if isinstance(check, Exception) else check
+                for check in checks
+            ]
             results["postgres"] = postgres_results
-            
-            # Verify Qdrant integrity
-            qdrant_results = await self._verify_qdrant_integrity()
             results["qdrant"] = qdrant_results
             
-            # Verify cross-database consistency
-            consistency_results = await self._verify_cross_db_consistency()
+            # Verify cross-database consistency, reusing the counts the checks above already fetched
+            pg_count = qdrant_count = None
+            if postgres_results["status"] == "healthy":
+                pg_count = postgres_results["details"]["tables_info"]["memory.memories"].get("record_count")
+            if qdrant_results["status"] == "healthy":
+                qdrant_count = qdrant_results["details"]["collections"].get("alsania_mem", {}).get("points_count", 0)
+            consistency_results = await self._verify_cross_db_consistency(pg_count, qdrant_count)
             results["consistency"] = consistency_results
             
             # Determine overall status
@@ -107,52 +268,43 @@ class PersistenceManager:
     async def _verify_postgres_integrity(self) -> Dict[str, any]:
         """Verify PostgreSQL data integrity"""
         try:
-            with self.get_postgres_connection() as conn:
-                with conn.cursor() as cur:
-                    # Check table existence and structure
-                    cur.execute("""
-                        SELECT table_name, column_name, data_type 
-                        FROM information_schema.columns 
-                        WHERE table_schema IN ('memory', 'forensics', 'agents')
-                        ORDER BY table_name, ordinal_position
-                    """)
-                    schema_info = cur.fetchall()
-                    
-                    # Count records in each table
-                    tables_info = {}
-                    for table in ['memory.memories', 'forensics.access_logs', 'agents.agent_states', 'memory.snapshots']:
-                        try:
-                            cur.execute(f"SELECT COUNT(*) as count FROM {table}")
-                            count = cur.fetchone()['count']
-                            
-                            cur.execute(f"SELECT MAX(created_at) as latest FROM {table}")
-                            latest = cur.fetchone()['latest']
-                            
-                            tables_info[table] = {
-                                "record_count": count,
-                                "latest_record": latest.isoformat() if latest else None
-                            }
-                        except Exception as e:
-                            tables_info[table] = {"error": str(e)}
-                    
-                    # Check for orphaned records
-                    cur.execute("""
-                        SELECT COUNT(*) as orphaned_logs
-                        FROM forensics.access_logs al
-                        LEFT JOIN memory.memories m ON al.memory_id = m.id
-                        WHERE m.id IS NULL AND al.memory_id IS NOT NULL
-                    """)
-                    orphaned_logs = cur.fetchone()['orphaned_logs']
-                    
-                    return {
-                        "status": "healthy",
-                        "details": {
-                            "schema_tables": len(set(row['table_name'] for row in schema_info)),
-                            "tables_info": tables_info,
-                            "orphaned_logs": orphaned_logs,
-                            "connection_pool": "active"
-                        }
+            async with self._acquire() as conn:
+                tables_info = {}
+                try:
+                    # Schema, per-table COUNT/MAX and orphan probes in a single round trip
+                    probed = TRACKED_TABLES
+                    rows = await conn.fetch(INTEGRITY_SQL)
+                except asyncpg.PostgresError:
+                    # A missing table or created_at column fails the combined query; read the
+                    # catalog once and re-run it over just the tables that can be probed
+                    columns = {row['name']: row['has_created_at'] for row in await conn.fetch(TABLE_COLUMNS_SQL)}
+                    for table in TRACKED_TABLES:
+                        if table not in columns:
+                            tables_info[table] = {"error": f'relation "{table}" does not exist'}
+                        elif not columns[table]:
+                            tables_info[table] = {"error": 'column "created_at" does not exist'}
+                    probed = [table for table in TRACKED_TABLES if columns.get(table)]
+                    rows = await conn.fetch(_integrity_sql(probed))
+                
+                probes = {row['probe']: row for row in rows}
+                schema_tables = probes['schema_tables']['count']
+                orphaned_logs = probes['orphaned_logs']['count']
+                for table in probed:
+                    row = probes[table]
+                    tables_info[table] = {
+                        "record_count": row['count'],
+                        "latest_record": row['latest'].isoformat() if row['latest'] else None
+                    }
+                
+                return {
+                    "status": "healthy",
+                    "details": {
+                        "schema_tables": schema_tables,
+                        "tables_info": {table: tables_info[table] for table in TRACKED_TABLES},
+                        "orphaned_logs": orphaned_logs,
+                        "connection_pool": "active"
                     }
+                }
                     
         except Exception as e:
             logger.error(f"PostgreSQL integrity check failed: {e}")
@@ -164,29 +316,28 @@ class PersistenceManager:
     async def _verify_qdrant_integrity(self) -> Dict[str, any]:
         """Verify Qdrant data integrity"""
         try:
-            client = self.get_qdrant_client()
+            client = await self.get_qdrant_client()
             
-            # Get collection info
-            collections = client.get_collections()
+            # Get collection info (all collections fetched concurrently)
+            names = await self._collection_names()
+            infos = await asyncio.gather(*(client.get_collection(name) for name in names), return_exceptions=True)
             collection_details = {}
             
-            for collection in collections.collections:
-                collection_name = collection.name
-                try:
-                    info = client.get_collection(collection_name)
-                    collection_details[collection_name] = {
-                        "vectors_count": info.vectors_count,
-                        "indexed_vectors_count": info.indexed_vectors_count,
-                        "points_count": info.points_count,
-                        "status": info.status.value if hasattr(info.status, 'value') else str(info.status)
-                    }
-                except Exception as e:
-                    collection_details[collection_name] = {"error": str(e)}
+            for collection_name, info in zip(names, infos):
+                if isinstance(info, Exception):
+                    collection_details[collection_name] = {"error": str(info)}
+                    continue
+                collection_details[collection_name] = {
+                    "vectors_count": info.vectors_count,
+                    "indexed_vectors_count": info.indexed_vectors_count,
+                    "points_count": info.points_count,
+                    "status": info.status.value if hasattr(info.status, 'value') else str(info.status)
+                }
             
             return {
                 "status": "healthy",
                 "details": {
-                    "collections_count": len(collections.collections),
+                    "collections_count": len(names),
                     "collections": collection_details,
                     "connection": "active"
                 }
@@ -199,28 +350,31 @@ class PersistenceManager:
                 "details": {"error": str(e)}
             }
     
-    async def _verify_cross_db_consistency(self) -> Dict[str, any]:
-        """Verify consistency between PostgreSQL and Qdrant"""
+    async def _verify_cross_db_consistency(self, pg_count: Optional[int] = None,
+                                           qdrant_count: Optional[int] = None) -> Dict[str, any]:
+        """Verify consistency between PostgreSQL and Qdrant (counts not passed in are fetched)
+
+        A fetched PostgreSQL count is the planner's reltuples estimate rather than COUNT(*);
+        like Qdrant's points_count it is approximate, which is fine for the 0.95 ratio threshold.
+        """
         try:
             # Get memory count from PostgreSQL
-            with self.get_postgres_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT COUNT(*) as pg_count FROM memory.memories")
-                    pg_count = cur.fetchone()['pg_count']
+            if pg_count is None:
+                async with self._acquire() as conn:
+                    pg_count = await conn.fetchval(MEMORIES_ESTIMATE_SQL)
+                    if pg_count < 0:  # never analyzed; no estimate yet
+                        pg_count = await conn.fetchval("SELECT COUNT(*) FROM memory.memories")
             
             # Get points count from Qdrant (if collection exists)
-            client = self.get_qdrant_client()
-            qdrant_count = 0
-            
-            try:
-                collections = client.get_collections()
-                for collection in collections.collections:
-                    if collection.name == "alsania_mem":
-                        info = client.get_collection("alsania_mem")
+            if qdrant_count is None:
+                qdrant_count = 0
+                try:
+                    if "alsania_mem" in await self._collection_names():
+                        client = await self.get_qdrant_client()
+                        info = await client.get_collection("alsania_mem")
                         qdrant_count = info.points_count
-                        break
-            except Exception as e:
-                logger.warning(f"Could not get Qdrant collection info: {e}")
+                except Exception as e:
+                    logger.warning(f"Could not get Qdrant collection info: {e}")
             
             # Calculate consistency ratio
             if pg_count == 0 and qdrant_count == 0:
@@ -250,8 +404,10 @@ class PersistenceManager:
                 "details": {"error": str(e)}
             }
     
-    async def create_data_backup(self, backup_name: Optional[str] = None) -> Dict[str, any]:
-        """Create a comprehensive backup of all data"""
+    async def create_data_backup(self, backup_name: Optional[str] = None,
+                                 include_vectors: bool = True) -> Dict[str, any]:
+        """Create a comprehensive backup of all data (include_vectors=False exports only Qdrant
+        ids and payloads, for restores that re-embed)"""
         if not backup_name:
             backup_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
@@ -269,7 +425,7 @@ class PersistenceManager:
             backup_results["postgres_backup"] = pg_backup
             
             # Create Qdrant backup
-            qdrant_backup = await self._backup_qdrant_data(backup_name)
+            qdrant_backup = await self._backup_qdrant_data(backup_name, include_vectors)
             backup_results["qdrant_backup"] = qdrant_backup
             
             backup_results["status"] = "completed"
@@ -284,40 +440,46 @@ class PersistenceManager:
     
     async def _backup_postgres_data(self, backup_name: str) -> Dict[str, any]:
         """Backup PostgreSQL data"""
-        backup_dir = Path("backups") / backup_name
+        backup_dir = BACKUP_ROOT / backup_name
         backup_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            with self.get_postgres_connection() as conn:
-                with conn.cursor() as cur:
-                    # Backup each table
-                    tables = ['memory.memories', 'forensics.access_logs', 'agents.agent_states', 'memory.snapshots']
-                    table_backups = {}
+            previous = await asyncio.to_thread(_load_backup_state)
+            updated = {}
+            async with self._acquire() as conn:
+                # Backup each table
+                table_backups = {}
+                
+                for table in TRACKED_TABLES:
+                    table_file = backup_dir / f"{table.replace('.', '_')}.csv.gz"
                     
-                    for table in tables:
-                        cur.execute(f"SELECT * FROM {table}")
-                        rows = cur.fetchall()
-                        
-                        # Convert to JSON-serializable format
-                        serializable_rows = []
-                        for row in rows:
-                            row_dict = dict(row)
-                            # Convert datetime objects to ISO strings
-                            for key, value in row_dict.items():
-                                if isinstance(value, datetime):
-                                    row_dict[key] = value.isoformat()
-                            serializable_rows.append(row_dict)
-                        
-                        # Save to file
-                        table_file = backup_dir / f"{table.replace('.', '_')}.json"
-                        with open(table_file, 'w') as f:
-                            json.dump(serializable_rows, f, indent=2)
+                    # Fingerprint taken before the dump, so a concurrent write only ever forces a re-dump
+                    fingerprint = await conn.fetchval(TABLE_FINGERPRINT_SQL.format(table=table))
+                    last = previous.get(table)
+                    if last and last[0] == fingerprint and await asyncio.to_thread(_link_previous, last[1], table_file):
+                        table_backups[table] = {"records": last[2], "file": str(table_file), "unchanged": True}
+                        updated[table] = (fingerprint, str(table_file), last[2])
+                        continue
+                    
+                    # Server-side COPY streams CSV chunks into the gzip file, no per-row decoding
+                    schema_name, table_name = table.split('.')
+                    with gzip.open(table_file, 'wb', compresslevel=BACKUP_COMPRESSLEVEL) as f:
+                        async def write_chunk(chunk: bytes, f=f):
+                            await asyncio.to_thread(f.write, chunk)
                         
-                        table_backups[table] = {
-                            "records": len(serializable_rows),
-                            "file": str(table_file)
-                        }
+                        status = await conn.copy_from_table(
+                            table_name, schema_name=schema_name, output=write_chunk,
+                            format='csv', header=True
+                        )
+                    
+                    records = int(status.split()[-1])  # "COPY <n>"
+                    table_backups[table] = {
+                        "records": records,
+                        "file": str(table_file)
+                    }
+                    updated[table] = (fingerprint, str(table_file), records)
             
+            await asyncio.to_thread(_save_backup_state, updated)
             return {
                 "status": "completed",
                 "tables": table_backups,
@@ -331,48 +493,100 @@ class PersistenceManager:
                 "error": str(e)
             }
     
-    async def _backup_qdrant_data(self, backup_name: str) -> Dict[str, any]:
+    @staticmethod
+    async def _dump_collection(client: AsyncQdrantClient, collection_name: str, path: Path,
+                               include_vectors: bool = True) -> int:
+        """Stream every point of a collection to path as gzipped NDJSON; returns the point count"""
+        def scroll(offset):
+            return asyncio.create_task(client.scroll(
+                collection_name=collection_name,
+                limit=QDRANT_BACKUP_PAGE_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=include_vectors
+            ))
+        
+        count = 0
+        pending = scroll(None)
+        try:
+            with gzip.open(path, 'wb', compresslevel=BACKUP_COMPRESSLEVEL) as f:
+                while True:
+                    points, offset = await pending
+                    # Prefetch the next page while this one is encoded and written
+                    if offset is not None:
+                        pending = scroll(offset)
+                    if include_vectors:
+                        records = ({"id": point.id, "vector": point.vector, "payload": point.payload} for point in points)
+                    else:
+                        records = ({"id": point.id, "payload": point.payload} for point in points)
+                    page = b"".join(orjson.dumps(record) + b"\n" for record in records)
+                    await asyncio.to_thread(f.write, page)
+                    count += len(points)
+                    if offset is None:
+                        return count
+        finally:
+            pending.cancel()  # no-op unless an error left a prefetch in flight
+    
+    async def _snapshot_collection(self, client: AsyncQdrantClient, collection_name: str, path: Path) -> int:
+        """Create a server-side snapshot (points, payloads and HNSW index), download it to path
+        and remove it from the server; returns the snapshot size in bytes"""
+        snapshot = await client.create_snapshot(collection_name=collection_name, wait=True)
+        try:
+            url = f"{self._qdrant_rest_url}/collections/{collection_name}/snapshots/{snapshot.name}"
+            async with httpx.AsyncClient(timeout=None) as http:
+                async with http.stream("GET", url) as response:
+                    response.raise_for_status()
+                    with open(path, 'wb') as f:
+                        async for chunk in response.aiter_bytes(1 << 20):
+                            await asyncio.to_thread(f.write, chunk)
+        finally:
+            await client.delete_snapshot(collection_name=collection_name, snapshot_name=snapshot.name)
+        return path.stat().st_size
+    
+    async def _backup_collection(self, client: AsyncQdrantClient, collection_name: str,
+                                 backup_dir: Path, include_vectors: bool) -> Dict[str, any]:
+        """Back up one collection; returns its entry for the backup report"""
+        async with self._backup_sem:
+            # Native snapshot first: restores without re-indexing (snapshots always carry vectors)
+            if include_vectors:
+                snapshot_file = backup_dir / f"qdrant_{collection_name}.snapshot"
+                try:
+                    size = await self._snapshot_collection(client, collection_name, snapshot_file)
+                    return {
+                        "snapshot_bytes": size,
+                        "file": str(snapshot_file)
+                    }
+                except Exception as e:
+                    logger.warning(f"Snapshot of {collection_name} failed, exporting points instead: {e}")
+                    snapshot_file.unlink(missing_ok=True)
+            
+            # Payload-only backups and failed snapshots: one NDJSON line per point, written page by page
+            collection_file = backup_dir / f"qdrant_{collection_name}.ndjson.gz"
+            points_written = await self._dump_collection(client, collection_name, collection_file, include_vectors)
+            
+            return {
+                "points": points_written,
+                "file": str(collection_file)
+            }
+    
+    async def _backup_qdrant_data(self, backup_name: str, include_vectors: bool = True) -> Dict[str, any]:
         """Backup Qdrant data"""
-        backup_dir = Path("backups") / backup_name
+        backup_dir = BACKUP_ROOT / backup_name
         backup_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            client = self.get_qdrant_client()
-            collections = client.get_collections()
+            client = await self.get_qdrant_client()
             
-            collection_backups = {}
-            for collection in collections.collections:
-                collection_name = collection.name
-                
-                # Get all points from collection
-                points = client.scroll(
-                    collection_name=collection_name,
-                    limit=10000,  # Adjust based on expected data size
-                    with_payload=True,
-                    with_vectors=True
-                )
-                
-                # Save collection data
-                collection_file = backup_dir / f"qdrant_{collection_name}.json"
-                collection_data = {
-                    "collection_name": collection_name,
-                    "points": [
-                        {
-                            "id": point.id,
-                            "vector": point.vector,
-                            "payload": point.payload
-                        }
-                        for point in points[0]  # points is a tuple (points, next_page_offset)
-                    ]
-                }
-                
-                with open(collection_file, 'w') as f:
-                    json.dump(collection_data, f, indent=2)
-                
-                collection_backups[collection_name] = {
-                    "points": len(collection_data["points"]),
-                    "file": str(collection_file)
-                }
+            # Collections are backed up concurrently, at most QDRANT_BACKUP_CONCURRENCY at a time
+            names = await self._collection_names()
+            results = await asyncio.gather(
+                *(self._backup_collection(client, name, backup_dir, include_vectors) for name in names),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+            collection_backups = dict(zip(names, results))
             
             return {
                 "status": "completed",
@@ -6,18 +6,54 @@ multiple sources, validation, and change notifications.
 """
 
 import os
-import json
+import re
+import copy
 import yaml
+import orjson
 import logging
+import functools
 from typing import Any, Dict, List, Optional, Callable, Union
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
 import asyncio
+from watchfiles import awatch
 from .events import EventBus, publish_event, SystemEventTypes
 
+try:
+    from yaml import CSafeLoader as _SafeLoader  # libyaml
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 logger = logging.getLogger("alsaniamcp.plugins.config")
 
+# Quiet period before a burst of file changes triggers one reload
+RELOAD_DEBOUNCE = 0.2
+
+# Classifies an env/.env string value in a single match
+_VALUE_RE = re.compile(
+    r'(?P<true>true|yes|1)|(?P<false>false|no|0)'
+    r'|(?P<int>[-+]?\d+)'
+    r'|(?P<float>[-+]?(?:\d+\.\d*|\.\d+)(?:e[-+]?\d+)?)',
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _convert_scalar(value: str) -> Any:
+    """Convert a non-JSON string value; cached since env values repeat across reloads"""
+    match = _VALUE_RE.fullmatch(value)
+    kind = match.lastgroup if match else None
+    if kind == 'true':
+        return True
+    elif kind == 'false':
+        return False
+    elif kind == 'int':
+        return int(value)
+    elif kind == 'float':
+        return float(value)
+    return value
+
 
 @dataclass
 class ConfigSource:
@@ -38,7 +74,13 @@ class ConfigManager:
         self._sources: List[ConfigSource] = []
         self._watchers: List[Callable[[str, Any, Any], None]] = []
         self._event_bus = event_bus
-        self._file_watchers: Dict[str, asyncio.Task] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+        self._reload_timer: Optional[asyncio.TimerHandle] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        self._path_to_source: Dict[str, ConfigSource] = {}
+        self._stop = asyncio.Event()
+        # path -> (st_mtime_ns, st_size, parsed config)
+        self._parse_cache: Dict[str, tuple] = {}
         self._lock = asyncio.Lock()
         
         # Default configuration
@@ -94,15 +136,14 @@ class ConfigManager:
     async def load_all(self) -> None:
         """Load configuration from all sources"""
         async with self._lock:
-            # Start with defaults
-            new_config = self._defaults.copy()
+            overrides = []
             
             # Load from sources in priority order
             for source in self._sources:
                 try:
                     source_config = await self._load_source(source)
                     if source_config:
-                        new_config = self._merge_config(new_config, source_config)
+                        overrides.append(source_config)
                         logger.debug(f"Loaded config from source: {source.name}")
                 except Exception as e:
                     logger.error(f"Failed to load config from {source.name}: {e}")
@@ -110,10 +151,13 @@ class ConfigManager:
             # Load environment variables
             env_config = self._load_environment()
             if env_config:
-                new_config = self._merge_config(new_config, env_config)
+                overrides.append(env_config)
             
-            # Update configuration
-            old_config = self._config.copy()
+            # Layer everything over the defaults. The result shares untouched
+            # subtrees with the defaults and is never mutated in place, so the
+            # previous config can be kept as-is for diffing.
+            new_config = self._merge_config(self._defaults, *overrides)
+            old_config = self._config
             self._config = new_config
             
             # Notify watchers of changes
@@ -131,22 +175,31 @@ class ConfigManager:
             return None
         
         # Update last modified time
-        source.last_modified = datetime.fromtimestamp(path.stat().st_mtime)
+        stat = path.stat()
+        source.last_modified = datetime.fromtimestamp(stat.st_mtime)
+        
+        # Skip the parse when the file hasn't changed since it was last read
+        cached = self._parse_cache.get(source.path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return copy.deepcopy(cached[2])
         
         try:
-            with open(path, 'r', encoding='utf-8') as f:
+            with open(path, 'rb') as f:
                 if source.format == 'json':
-                    return json.load(f)
+                    config = orjson.loads(f.read())
                 elif source.format == 'yaml':
-                    return yaml.safe_load(f)
+                    config = yaml.load(f, Loader=_SafeLoader)
                 elif source.format == 'env':
-                    return self._parse_env_file(f.read())
+                    config = self._parse_env_file(f.read().decode('utf-8'))
                 else:
                     logger.error(f"Unsupported config format: {source.format}")
                     return None
         except Exception as e:
             logger.error(f"Error reading config file {source.path}: {e}")
             return None
+        
+        self._parse_cache[source.path] = (stat.st_mtime_ns, stat.st_size, config)
+        return copy.deepcopy(config)
     
     def _parse_env_file(self, content: str) -> Dict[str, Any]:
         """Parse environment file content"""
@@ -189,71 +242,105 @@ class ConfigManager:
     
     def _convert_value(self, value: str) -> Any:
         """Convert string value to appropriate type"""
-        # Boolean values
-        if value.lower() in ('true', 'yes', '1'):
-            return True
-        elif value.lower() in ('false', 'no', '0'):
-            return False
-        
-        # Numeric values
-        try:
-            if '.' in value:
-                return float(value)
-            else:
-                return int(value)
-        except ValueError:
-            pass
-        
-        # JSON values
-        if value.startswith(('{', '[')):
+        # JSON values are parsed fresh each time so callers never share
+        # a mutable container through the cache
+        if value[:1] in ('{', '['):
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                pass
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
+                return value
         
-        # String value
-        return value
+        return _convert_scalar(value)
     
-    def _merge_config(self, base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
-        """Merge two configuration dictionaries"""
-        result = base.copy()
+    def _merge_config(self, base: Dict[str, Any], *overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge configuration dictionaries over base, later ones winning.
         
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._merge_config(result[key], value)
-            else:
-                result[key] = value
+        Neither base nor the overrides are modified. A nested dict of base is
+        copied only when an override writes into it, and at most once.
+        """
+        result = dict(base)
+        owned = {id(result)}  # dicts created here, safe to write into
+        
+        for override in overrides:
+            stack = [(result, override)]
+            while stack:
+                target, source = stack.pop()
+                for key, value in source.items():
+                    current = target.get(key)
+                    if isinstance(current, dict) and isinstance(value, dict):
+                        if id(current) not in owned:
+                            current = dict(current)
+                            owned.add(id(current))
+                            target[key] = current
+                        stack.append((current, value))
+                    else:
+                        target[key] = value
         
         return result
     
     async def _start_file_watchers(self) -> None:
-        """Start file watchers for configuration sources"""
-        for source in self._sources:
-            if source.watch and source.path not in self._file_watchers:
-                task = asyncio.create_task(self._watch_file(source))
-                self._file_watchers[source.path] = task
+        """Start the file watcher for configuration sources"""
+        path_to_source = {
+            str(Path(source.path).resolve()): source
+            for source in self._sources if source.watch
+        }
+        task = self._watch_task
+        unchanged = path_to_source.keys() == self._path_to_source.keys()
+        self._path_to_source = path_to_source
+        if task and not task.done():
+            if unchanged:
+                return
+            # Watched paths changed; let the old loop exit and start a new one.
+            # Not awaited, since this may run from inside the loop's reload.
+            self._stop.set()
+        
+        if path_to_source:
+            self._stop = asyncio.Event()
+            self._watch_task = asyncio.create_task(self._awatch_loop())
     
-    async def _watch_file(self, source: ConfigSource) -> None:
-        """Watch a configuration file for changes"""
-        path = Path(source.path)
-        last_mtime = source.last_modified
+    async def _awatch_loop(self) -> None:
+        """Reload sources whose files change, using OS file notifications"""
+        # Watch the parent directories so editors that save by renaming a
+        # temp file over the original (and files created later) are seen
+        dirs = {str(Path(path).parent) for path in self._path_to_source}
+        dirs = [d for d in dirs if os.path.isdir(d)]
+        if not dirs:
+            return
         
-        while True:
-            try:
-                await asyncio.sleep(1)  # Check every second
-                
-                if path.exists():
-                    current_mtime = datetime.fromtimestamp(path.stat().st_mtime)
-                    if last_mtime is None or current_mtime > last_mtime:
+        try:
+            async for changes in awatch(
+                *dirs,
+                watch_filter=lambda _, path: path in self._path_to_source,
+                debounce=200,
+                step=50,
+                stop_event=self._stop,
+            ):
+                for _, path in changes:
+                    source = self._path_to_source.get(path)
+                    if source:
                         logger.info(f"Config file changed: {source.path}")
-                        await self.reload_source(source.name)
-                        last_mtime = current_mtime
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error watching config file {source.path}: {e}")
-                await asyncio.sleep(5)  # Wait before retrying
+                        self._schedule_reload(source.name)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error watching config files: {e}")
+    
+    def _schedule_reload(self, source_name: str) -> None:
+        """Coalesce changes into one reload after a quiet period.
+        
+        Editors often save in several writes (or write a temp file and rename
+        it), which can span more than one watch batch. reload_source reloads
+        every source, so whichever change comes last wins.
+        """
+        if self._reload_timer:
+            self._reload_timer.cancel()
+        self._reload_timer = asyncio.get_running_loop().call_later(
+            RELOAD_DEBOUNCE, self._fire_reload, source_name
+        )
+    
+    def _fire_reload(self, source_name: str) -> None:
+        self._reload_timer = None
+        self._reload_task = asyncio.create_task(self.reload_source(source_name))
     
     async def reload_source(self, source_name: str) -> None:
         """Reload configuration from a specific source"""
@@ -273,6 +360,8 @@ class ConfigManager:
     
     async def _notify_changes(self, old_config: Dict[str, Any], new_config: Dict[str, Any]) -> None:
         """Notify watchers of configuration changes"""
+        if not self._watchers and not self._event_bus:
+            return
         changes = self._find_changes(old_config, new_config)
         
         for key, (old_value, new_value) in changes.items():
@@ -282,39 +371,43 @@ class ConfigManager:
                     watcher(key, old_value, new_value)
                 except Exception as e:
                     logger.error(f"Error in config watcher: {e}")
-            
-            # Publish event
-            if self._event_bus:
-                await publish_event(
-                    SystemEventTypes.CONFIG_CHANGED,
-                    data={
-                        'key': key,
-                        'old_value': old_value,
-                        'new_value': new_value
-                    },
-                    source="config_manager"
-                )
+        
+        # Publish one event for the whole batch
+        if self._event_bus and changes:
+            await publish_event(
+                SystemEventTypes.CONFIG_CHANGED,
+                data={
+                    'changes': [
+                        {'key': key, 'old_value': old_value, 'new_value': new_value}
+                        for key, (old_value, new_value) in changes.items()
+                    ]
+                },
+                source="config_manager"
+            )
     
     def _find_changes(self, old: Dict[str, Any], new: Dict[str, Any], prefix: str = "") -> Dict[str, tuple]:
         """Find changes between two configuration dictionaries"""
         changes = {}
+        missing = object()
+        stack = [(prefix, old, new)]
         
-        # Check for changed/added values
-        for key, value in new.items():
-            full_key = f"{prefix}.{key}" if prefix else key
-            
-            if key not in old:
-                changes[full_key] = (None, value)
-            elif isinstance(value, dict) and isinstance(old[key], dict):
-                changes.update(self._find_changes(old[key], value, full_key))
-            elif old[key] != value:
-                changes[full_key] = (old[key], value)
-        
-        # Check for removed values
-        for key in old:
-            if key not in new:
-                full_key = f"{prefix}.{key}" if prefix else key
-                changes[full_key] = (old[key], None)
+        while stack:
+            path, old_sub, new_sub = stack.pop()
+            # Subtrees shared by both configs (see _merge_config) can't differ
+            if old_sub is new_sub:
+                continue
+            for key in dict.fromkeys([*new_sub, *old_sub]):
+                full_key = f"{path}.{key}" if path else key
+                old_value = old_sub.get(key, missing)
+                new_value = new_sub.get(key, missing)
+                if isinstance(old_value, dict) and isinstance(new_value, dict):
+                    stack.append((full_key, old_value, new_value))
+                elif old_value is missing:
+                    changes[full_key] = (None, new_value)
+                elif new_value is missing:
+                    changes[full_key] = (old_value, None)
+                elif old_value is not new_value and old_value != new_value:
+                    changes[full_key] = (old_value, new_value)
         
         return changes
     
@@ -333,15 +426,18 @@ class ConfigManager:
     def set(self, key: str, value: Any) -> None:
         """Set configuration value"""
         keys = key.split('.')
-        current = self._config
         
+        # Copy the dicts along the path rather than writing in place; they
+        # may be shared with the defaults or a snapshot held for diffing
+        root = current = dict(self._config)
         for k in keys[:-1]:
-            if k not in current:
-                current[k] = {}
+            child = current.get(k)
+            current[k] = dict(child) if isinstance(child, dict) else {}
             current = current[k]
         
         old_value = current.get(keys[-1])
         current[keys[-1]] = value
+        self._config = root
         
         # Notify watchers
         for watcher in self._watchers:
@@ -367,13 +463,20 @@ class ConfigManager:
     
     async def shutdown(self) -> None:
         """Shutdown configuration manager"""
-        # Cancel file watchers
-        for task in self._file_watchers.values():
+        # Stop the file watcher and any pending reload
+        self._stop.set()
+        if self._reload_timer:
+            self._reload_timer.cancel()
+            self._reload_timer = None
+        
+        tasks = [t for t in (self._watch_task, self._reload_task) if t]
+        for task in tasks:
             task.cancel()
         
         # Wait for tasks to complete
-        if self._file_watchers:
-            await asyncio.gather(*self._file_watchers.values(), return_exceptions=True)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
         
-        self._file_watchers.clear()
+        self._watch_task = None
+        self._reload_task = None
         logger.info("Configuration manager shutdown complete")
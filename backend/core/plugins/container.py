@@ -7,14 +7,16 @@ enabling loose coupling between components.
 
 import inspect
 import logging
-from typing import Any, Callable, Dict, Type, TypeVar, Union, get_type_hints
-from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Type, TypeVar, Union, get_type_hints
+from threading import RLock, local
 from .exceptions import ServiceResolutionError
 
 logger = logging.getLogger("alsaniamcp.plugins.container")
 
 T = TypeVar('T')
 
+_MISSING = object()
+
 
 class ServiceLifetime:
     """Service lifetime management"""
@@ -40,39 +42,48 @@ class ServiceContainer:
     def __init__(self):
         self._services: Dict[Type, ServiceDescriptor] = {}
         self._singletons: Dict[Type, Any] = {}
-        self._lock = Lock()
-        self._building = set()  # Track services being built to prevent circular dependencies
+        # Reentrant: building a singleton may resolve other singletons
+        self._lock = RLock()
+        self._local = local()  # per-thread set of services being built
+        # cls -> [(param_name, param_type, has_default)], built once per class
+        self._injection_plan_cache: Dict[Type, List[Tuple[str, Any, bool]]] = {}
         
         # Register self
-        self.register_singleton(ServiceContainer, self)
+        self.register_instance(ServiceContainer, self)
+    
+    @property
+    def _building(self) -> set:
+        """Services being built on this thread, to detect circular dependencies"""
+        building = getattr(self._local, 'building', None)
+        if building is None:
+            building = self._local.building = set()
+        return building
+    
+    def _register(self, *descriptors: ServiceDescriptor):
+        """Install descriptors, dropping any singleton built from an earlier registration"""
+        with self._lock:
+            for descriptor in descriptors:
+                self._services[descriptor.service_type] = descriptor
+                self._singletons.pop(descriptor.service_type, None)
     
     def register_singleton(self, service_type: Type[T], 
                           implementation: Union[Type[T], Callable[[], T]]) -> 'ServiceContainer':
         """Register a singleton service"""
-        with self._lock:
-            self._services[service_type] = ServiceDescriptor(
-                service_type, implementation, ServiceLifetime.SINGLETON
-            )
+        self._register(ServiceDescriptor(service_type, implementation, ServiceLifetime.SINGLETON))
         logger.debug(f"Registered singleton service: {service_type.__name__}")
         return self
     
     def register_transient(self, service_type: Type[T],
                           implementation: Union[Type[T], Callable[[], T]]) -> 'ServiceContainer':
         """Register a transient service"""
-        with self._lock:
-            self._services[service_type] = ServiceDescriptor(
-                service_type, implementation, ServiceLifetime.TRANSIENT
-            )
+        self._register(ServiceDescriptor(service_type, implementation, ServiceLifetime.TRANSIENT))
         logger.debug(f"Registered transient service: {service_type.__name__}")
         return self
     
     def register_scoped(self, service_type: Type[T],
                        implementation: Union[Type[T], Callable[[], T]]) -> 'ServiceContainer':
         """Register a scoped service (per request/operation)"""
-        with self._lock:
-            self._services[service_type] = ServiceDescriptor(
-                service_type, implementation, ServiceLifetime.SCOPED
-            )
+        self._register(ServiceDescriptor(service_type, implementation, ServiceLifetime.SCOPED))
         logger.debug(f"Registered scoped service: {service_type.__name__}")
         return self
     
@@ -89,25 +100,38 @@ class ServiceContainer:
     def register_factory(self, service_type: Type[T], 
                         factory: Callable[[], T]) -> 'ServiceContainer':
         """Register a factory function for creating service instances"""
-        with self._lock:
-            self._services[service_type] = ServiceDescriptor(
-                service_type, factory, ServiceLifetime.TRANSIENT
-            )
+        self._register(ServiceDescriptor(service_type, factory, ServiceLifetime.TRANSIENT))
         logger.debug(f"Registered factory for service: {service_type.__name__}")
         return self
     
+    def register_many(self, registrations: Iterable[Tuple[Type, Union[Type, Callable], str]]) -> 'ServiceContainer':
+        """Register several (service_type, implementation, lifetime) entries under one lock"""
+        descriptors = [
+            ServiceDescriptor(service_type, implementation, lifetime)
+            for service_type, implementation, lifetime in registrations
+        ]
+        self._register(*descriptors)
+        logger.debug(f"Registered {len(descriptors)} services")
+        return self
+    
     def resolve(self, service_type: Type[T]) -> T:
         """Resolve a service instance"""
-        if service_type in self._building:
+        # Lock-free fast path for singletons that already exist
+        instance = self._singletons.get(service_type, _MISSING)
+        if instance is not _MISSING:
+            return instance
+        
+        building = self._building
+        if service_type in building:
             raise ServiceResolutionError(
                 f"Circular dependency detected while resolving {service_type.__name__}"
             )
         
         try:
-            self._building.add(service_type)
+            building.add(service_type)
             return self._resolve_internal(service_type)
         finally:
-            self._building.discard(service_type)
+            building.discard(service_type)
     
     def _resolve_internal(self, service_type: Type[T]) -> T:
         """Internal service resolution logic"""
@@ -121,12 +145,16 @@ class ServiceContainer:
         
         # Handle singleton lifetime
         if descriptor.lifetime == ServiceLifetime.SINGLETON:
-            if service_type in self._singletons:
-                return self._singletons[service_type]
-            
-            instance = self._create_instance(descriptor)
-            self._singletons[service_type] = instance
-            return instance
+            # Double-checked: another thread may have built it, or re-registered the service, meanwhile
+            with self._lock:
+                instance = self._singletons.get(service_type, _MISSING)
+                if instance is not _MISSING:
+                    return instance
+                descriptor = self._services[service_type]
+                if descriptor.lifetime == ServiceLifetime.SINGLETON:
+                    instance = self._create_instance(descriptor)
+                    self._singletons[service_type] = instance
+                    return instance
         
         # Handle transient and scoped lifetimes
         return self._create_instance(descriptor)
@@ -153,38 +181,50 @@ class ServiceContainer:
             f"Invalid implementation type for {descriptor.service_type.__name__}"
         )
     
+    def _build_plan(self, cls: Type) -> List[Tuple[str, Any, bool]]:
+        """Reflect on a constructor once and record what it needs injected"""
+        signature = inspect.signature(cls.__init__)
+        type_hints = get_type_hints(cls.__init__)
+        
+        plan = []
+        for param_name, param in signature.parameters.items():
+            if param_name == 'self':
+                continue
+            
+            # Get parameter type from type hints
+            param_type = type_hints.get(param_name)
+            if param_type is None:
+                # Try to get type from annotation
+                param_type = param.annotation
+            
+            has_default = param.default != inspect.Parameter.empty
+            if param_type == inspect.Parameter.empty:
+                if not has_default:
+                    raise ServiceResolutionError(
+                        f"Cannot resolve parameter '{param_name}' for {cls.__name__}: "
+                        f"no type annotation and no default value"
+                    )
+                continue  # Skip parameters with default values
+            
+            plan.append((param_name, param_type, has_default))
+        
+        self._injection_plan_cache[cls] = plan
+        return plan
+    
     def _create_instance_with_injection(self, cls: Type) -> Any:
         """Create an instance with constructor dependency injection"""
         try:
-            # Get constructor signature
-            signature = inspect.signature(cls.__init__)
-            type_hints = get_type_hints(cls.__init__)
+            plan = self._injection_plan_cache.get(cls)
+            if plan is None:
+                plan = self._build_plan(cls)
             
             # Resolve constructor parameters
             kwargs = {}
-            for param_name, param in signature.parameters.items():
-                if param_name == 'self':
-                    continue
-                
-                # Get parameter type from type hints
-                param_type = type_hints.get(param_name)
-                if param_type is None:
-                    # Try to get type from annotation
-                    param_type = param.annotation
-                
-                if param_type == inspect.Parameter.empty:
-                    if param.default == inspect.Parameter.empty:
-                        raise ServiceResolutionError(
-                            f"Cannot resolve parameter '{param_name}' for {cls.__name__}: "
-                            f"no type annotation and no default value"
-                        )
-                    continue  # Skip parameters with default values
-                
-                # Resolve the dependency
+            for param_name, param_type, has_default in plan:
                 try:
                     kwargs[param_name] = self.resolve(param_type)
                 except ServiceResolutionError:
-                    if param.default != inspect.Parameter.empty:
+                    if has_default:
                         continue  # Use default value
                     raise
             
@@ -211,8 +251,9 @@ class ServiceContainer:
             self._services.clear()
             self._singletons.clear()
             self._building.clear()
+            self._injection_plan_cache.clear()
             # Re-register self
-            self.register_singleton(ServiceContainer, self)
+            self.register_instance(ServiceContainer, self)
         logger.info("Service container cleared")
     
     def create_scope(self) -> 'ScopedServiceContainer':
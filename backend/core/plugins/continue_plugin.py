@@ -2,8 +2,8 @@ from fastapi import APIRouter, Request, BackgroundTasks, WebSocket, WebSocketDis
 from fastapi.responses import JSONResponse, StreamingResponse
 from backend.core import state_manager
 import asyncio, time
-import json
 import uuid
+import orjson
 
 router = APIRouter()
 websocket_clients = set()
@@ -22,7 +22,7 @@ async def agent_invoke(request: Request, background_tasks: BackgroundTasks):
     instruction = body.get("instruction", "")
 
     # Save initial state
-    state_manager.add_session(session_id, {
+    await asyncio.to_thread(state_manager.add_session, session_id, {
         "last_instruction": instruction,
         "task_status": "queued"
     })
@@ -34,16 +34,17 @@ async def agent_invoke(request: Request, background_tasks: BackgroundTasks):
         "status": "queued"
     })
 
-def handle_task(session_id, instruction):
-    state = state_manager.load_state()
+async def handle_task(session_id, instruction):
+    # State file I/O runs in a worker thread to keep the event loop free
+    state = await asyncio.to_thread(state_manager.load_state)
     state["sessions"][session_id]["task_status"] = "running"
-    state_manager.save_state(state)
-    time.sleep(2)
+    await asyncio.to_thread(state_manager.save_state, state)
+    await asyncio.sleep(2)
     result = f"Task completed: {instruction}"
     state["sessions"][session_id]["task_result"] = result
     state["sessions"][session_id]["task_status"] = "done"
-    state_manager.save_state(state)
-    asyncio.run(notify_clients(session_id, result))
+    await asyncio.to_thread(state_manager.save_state, state)
+    await notify_clients(session_id, result)
 
 async def notify_clients(session_id, result):
     dead_clients = []
@@ -79,20 +80,18 @@ async def chat(request: Request):
     body = await request.json()
     session_id = body.get("session_id", "default")
     message = body.get("message", "")
-    state = state_manager.load_state()
+    state = await asyncio.to_thread(state_manager.load_state)
     session = state["sessions"].setdefault(session_id, {"chat": []})
     session["chat"].append({"user": message})
-    state_manager.save_state(state)
+    await asyncio.to_thread(state_manager.save_state, state)
 
     async def sse():
         reply = f"Echo: {message}"
-        partial = ""
-        for char in reply:
-            partial += char
-            yield f"data: {partial}\n\n"
+        for end in range(1, len(reply) + 1):
+            yield "data: " + reply[:end] + "\n\n"
             await asyncio.sleep(0.03)
         session["chat"][-1]["echo"] = reply
-        state_manager.save_state(state)
+        await asyncio.to_thread(state_manager.save_state, state)
 
     return StreamingResponse(sse(), media_type="text/event-stream")
 
@@ -121,17 +120,25 @@ async def openai_chat_completions(request: Request):
 
     if stream:
         async def stream_response():
+            # id/created/model are fixed for the whole completion, so the
+            # envelope is encoded once and only the content is spliced in
+            envelope = {'id': str(uuid.uuid4()), 'object': 'chat.completion.chunk',
+                        'created': int(time.time()), 'model': model}
+            head = orjson.dumps(envelope)[:-1]
+            prefix = b'data: ' + head + b',"choices":[{"index":0,"delta":{"content":'
+            suffix = b'},"finish_reason":null}]}\n\n'
+
             # Send initial chunk
-            yield f"data: {json.dumps({'id': str(uuid.uuid4()), 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model, 'choices': [{'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}]})}\n\n"
+            yield b'data: ' + head + b',"choices":[{"index":0,"delta":{"role":"assistant","content":""},"finish_reason":null}]}\n\n'
 
             # Stream the response character by character
             for char in response_text:
-                yield f"data: {json.dumps({'id': str(uuid.uuid4()), 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model, 'choices': [{'index': 0, 'delta': {'content': char}, 'finish_reason': None}]})}\n\n"
+                yield prefix + orjson.dumps(char) + suffix
                 await asyncio.sleep(0.01)  # Small delay for streaming effect
 
             # Send final chunk
-            yield f"data: {json.dumps({'id': str(uuid.uuid4()), 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
-            yield "data: [DONE]\n\n"
+            yield b'data: ' + head + b',"choices":[{"index":0,"delta":{},"finish_reason":"stop"}]}\n\n'
+            yield b"data: [DONE]\n\n"
 
         return StreamingResponse(stream_response(), media_type="text/event-stream")
     else:
@@ -4,11 +4,19 @@ Shared Utilities for AlsaniaMCP
 Common functions and utilities used across the system
 """
 
+import asyncio
 import hashlib
 import json
 import logging
+import os
+import threading
+import uuid
+import weakref
+from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
+
+from cachetools import TTLCache, cached
 
 logger = logging.getLogger("alsaniamcp.shared")
 
@@ -32,6 +40,101 @@ def safe_json_loads(data: str) -> Optional[Dict]:
         logger.error(f"Failed to deserialize JSON: {e}")
         return None
 
+def cached_with_ttl(seconds: float, maxsize: int = 128) -> Callable:
+    """Memoize a function's result per call arguments for `seconds` (at most `maxsize` entries)"""
+    def decorator(func: Callable) -> Callable:
+        return cached(TTLCache(maxsize=maxsize, ttl=seconds), lock=threading.Lock())(func)
+    return decorator
+
+class IdGen:
+    """Random ids drawn from a buffered os.urandom block (one syscall per 4 KiB of ids)"""
+
+    def __init__(self, block_size: int = 4096):
+        self.block_size = block_size
+        self.buf = b""
+        self._lock = threading.Lock()
+        # A forked child must not hand out the ids left in the parent's buffer
+        if hasattr(os, "register_at_fork"):
+            ref = weakref.WeakMethod(self._reset)
+
+            def after_fork():
+                reset = ref()
+                if reset is not None:
+                    reset()
+
+            os.register_at_fork(after_in_child=after_fork)
+
+    def _reset(self):
+        self.buf = b""
+        self._lock = threading.Lock()
+
+    def next_bytes(self, n: int = 16) -> bytes:
+        with self._lock:
+            if len(self.buf) < n:
+                self.buf = os.urandom(max(self.block_size, n))
+            out, self.buf = self.buf[:n], self.buf[n:]
+        return out
+
+    def next_hex(self, n: int = 16) -> str:
+        """2*n hex characters from n random bytes"""
+        return self.next_bytes(n).hex()
+
+    def uuid4(self) -> str:
+        """Random (version 4) UUID string"""
+        return str(uuid.UUID(bytes=self.next_bytes(16), version=4))
+
+idgen = IdGen()
+
+async def collect_batch(queue: asyncio.Queue, max_batch: int, max_wait: float) -> list:
+    """Wait for one queued item, then gather more until max_batch or max_wait elapses."""
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + max_wait
+    while len(batch) < max_batch:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+class QueueBatcher(ABC):
+    """Base for queue-draining batchers whose worker task starts on first use."""
+
+    # Callers give up on a queued item after this many seconds
+    timeout = 30.0
+
+    def __init__(self, max_batch: int, max_wait: float):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue: asyncio.Queue = None
+        self._task: asyncio.Task = None
+
+    def start(self):
+        """Start the worker on the running loop unless it is already alive there."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self.queue = asyncio.Queue()
+            self._task = loop.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _submit(self, *item):
+        """Queue item and wait (bounded by timeout) for the worker to resolve it."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((*item, future))
+        return await asyncio.wait_for(future, self.timeout)
+
+    @abstractmethod
+    async def run(self):
+        """Worker loop: drain self.queue and resolve each item's future."""
+
 def format_timestamp(dt: datetime = None) -> str:
     """Format timestamp for consistent use across the system"""
     if dt is None:
@@ -8,7 +8,7 @@ import logging
 import uuid
 import hashlib
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from pathlib import Path
 import psycopg2
 import psycopg2.extras
@@ -17,6 +17,9 @@ from config.config import config
 
 logger = logging.getLogger("alsaniamcp.snapshots")
 
+# Rows fetched per round trip when streaming snapshot listings
+SNAPSHOT_FETCH_SIZE = 500
+
 class SnapshotManager:
     """Manages agent memory state snapshots and rollback functionality"""
     
@@ -229,62 +232,101 @@ class SnapshotManager:
             logger.error(f"Failed to create agent snapshot: {e}")
             raise
     
-    def list_agent_snapshots(self, agent_id: str = None, include_inactive: bool = False) -> List[Dict]:
-        """List snapshots for an agent or all snapshots"""
+    @staticmethod
+    def _snapshot_row(row: Dict) -> Dict:
+        return {
+            'id': row['id'],
+            'snapshot_name': row['snapshot_name'],
+            'agent_id': row['agent_id'],
+            'agent_name': row['agent_name'],
+            'agent_display_name': row['display_name'],
+            'description': row['description'],
+            'snapshot_type': row['snapshot_type'],
+            'memory_count': row['memory_count'],
+            'vector_count': row['vector_count'],
+            'data_hash': row['data_hash'],
+            'file_path': row['file_path'],
+            'metadata': row['metadata'],
+            'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+            'created_by': row['created_by'],
+            'is_active': row['is_active']
+        }
+
+    def iter_agent_snapshots(self, agent_id: str = None, include_inactive: bool = False,
+                             api_key_id: str = None) -> Iterator[Dict]:
+        """Yield snapshots like list_agent_snapshots, fetched through a server-side cursor"""
+        conditions = []
+        params = []
+
+        if agent_id:
+            conditions.append("agent_id = %s")
+            params.append(agent_id)
+
+        if not include_inactive:
+            conditions.append("s.is_active = true")
+
+        if api_key_id:
+            conditions.append("a.api_key_id = %s AND a.is_active = true")
+            params.append(api_key_id)
+
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+        conn = self.get_postgres_connection()
+        try:
+            # Named cursor: rows arrive in itersize batches instead of all at once
+            with conn.cursor(name="agent_snapshots") as cur:
+                cur.itersize = SNAPSHOT_FETCH_SIZE
+                cur.execute(f"""
+                    SELECT s.id, s.snapshot_name, s.agent_id, s.description, 
+                           s.snapshot_type, s.memory_count, s.vector_count,
+                           s.data_hash, s.file_path, s.metadata, s.created_at, 
+                           s.created_by, s.is_active,
+                           a.agent_name, a.display_name
+                    FROM memory.agent_snapshots s
+                    LEFT JOIN agents.agent_identities a ON s.agent_id = a.id
+                    {where_clause}
+                    ORDER BY s.created_at DESC
+                """, params)
+
+                for row in cur:
+                    yield self._snapshot_row(row)
+        finally:
+            conn.close()
+
+    def list_agent_snapshots(self, agent_id: str = None, include_inactive: bool = False,
+                             api_key_id: str = None) -> List[Dict]:
+        """List snapshots for an agent or all snapshots, optionally only those of an API key's agents"""
+        
+        try:
+            return list(self.iter_agent_snapshots(agent_id, include_inactive, api_key_id))
+        except Exception as e:
+            logger.error(f"Failed to list agent snapshots: {e}")
+            return []
+    
+    def get_snapshot(self, snapshot_id: str) -> Optional[Dict]:
+        """Get an active snapshot by ID"""
         
         try:
             with self.get_postgres_connection() as conn:
                 with conn.cursor() as cur:
-                    conditions = []
-                    params = []
-                    
-                    if agent_id:
-                        conditions.append("agent_id = %s")
-                        params.append(agent_id)
-                    
-                    if not include_inactive:
-                        conditions.append("s.is_active = true")
-                    
-                    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
-                    
-                    cur.execute(f"""
-                        SELECT s.id, s.snapshot_name, s.agent_id, s.description, 
-                               s.snapshot_type, s.memory_count, s.vector_count,
-                               s.data_hash, s.file_path, s.metadata, s.created_at, 
-                               s.created_by, s.is_active,
-                               a.agent_name, a.display_name
-                        FROM memory.agent_snapshots s
-                        LEFT JOIN agents.agent_identities a ON s.agent_id = a.id
-                        {where_clause}
-                        ORDER BY s.created_at DESC
-                    """, params)
+                    cur.execute("""
+                        SELECT id, snapshot_name, agent_id, file_path, data_hash,
+                               created_at, created_by, is_active
+                        FROM memory.agent_snapshots
+                        WHERE id = %s AND is_active = true
+                    """, (snapshot_id,))
                     
-                    results = cur.fetchall()
+                    row = cur.fetchone()
+                    if not row:
+                        return None
                     
-                    return [
-                        {
-                            'id': row['id'],
-                            'snapshot_name': row['snapshot_name'],
-                            'agent_id': row['agent_id'],
-                            'agent_name': row['agent_name'],
-                            'agent_display_name': row['display_name'],
-                            'description': row['description'],
-                            'snapshot_type': row['snapshot_type'],
-                            'memory_count': row['memory_count'],
-                            'vector_count': row['vector_count'],
-                            'data_hash': row['data_hash'],
-                            'file_path': row['file_path'],
-                            'metadata': row['metadata'],
-                            'created_at': row['created_at'].isoformat() if row['created_at'] else None,
-                            'created_by': row['created_by'],
-                            'is_active': row['is_active']
-                        }
-                        for row in results
-                    ]
+                    snapshot = dict(row)
+                    snapshot['created_at'] = row['created_at'].isoformat() if row['created_at'] else None
+                    return snapshot
                     
         except Exception as e:
-            logger.error(f"Failed to list agent snapshots: {e}")
-            return []
+            logger.error(f"Failed to get snapshot {snapshot_id}: {e}")
+            return None
     
     def restore_agent_snapshot(self, snapshot_id: str, restore_type: str = "full",
                               created_by: str = "system") -> Dict:
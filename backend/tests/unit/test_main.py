@@ -35,7 +35,7 @@ def test_routes():
         app = main.app
         
         expected_routes = [
-            "/", "/health", "/ready", "/ask", "/store", "/stream"
+            "/", "/health", "/ready", "/healthz", "/readyz", "/ask", "/store", "/stream"
         ]
         
         actual_routes = [route.path for route in app.routes if hasattr(route, 'path')]
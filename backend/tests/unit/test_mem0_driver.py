@@ -0,0 +1,22 @@
+from backend.core.memory.adapters.mem0.driver import Mem0Driver
+
+
+def test_two_drivers_share_directory(tmp_path):
+    first = Mem0Driver(str(tmp_path))
+    second = Mem0Driver(str(tmp_path))
+
+    # Interleave appends so each driver's offsets go stale between its own writes
+    for i in range(6):
+        writer = first if i % 2 == 0 else second
+        vector = [0.0] * 4
+        vector[i % 4] = 1.0
+        writer.upsert([vector], [{"i": i}])
+
+    for driver in (first, second, Mem0Driver(str(tmp_path))):
+        for i in range(6):
+            vector = [0.0] * 4
+            vector[i % 4] = 1.0
+            hits = driver.query(vector, top_k=6)
+            matching = {hit["payload"]["i"] for hit in hits if hit["score"] > 0.99}
+            assert matching == {j for j in range(6) if j % 4 == i % 4}
+        assert driver._rows == len(driver._payloads) == 6
@@ -143,6 +143,29 @@ class TestServiceContainer:
         assert resolved is instance
         assert resolved.value == "test_value"
     
+    def test_reregistration_replaces_singleton(self, container):
+        """Test re-registering a resolved singleton drops the old instance"""
+        class TestService:
+            def __init__(self):
+                self.value = "test"
+        
+        class OtherService(TestService):
+            pass
+        
+        container.register_singleton(TestService, TestService)
+        original = container.resolve(TestService)
+        
+        container.register_singleton(TestService, OtherService)
+        replaced = container.resolve(TestService)
+        assert isinstance(replaced, OtherService)
+        assert container.resolve(TestService) is replaced
+        
+        container.register_transient(TestService, TestService)
+        instance1 = container.resolve(TestService)
+        instance2 = container.resolve(TestService)
+        assert instance1 is not instance2
+        assert original not in (instance1, instance2)
+        
     def test_dependency_injection(self, container):
         """Test constructor dependency injection"""
         class Dependency: